@@ -0,0 +1,96 @@
+"""
+Precomputed action catalog
+The merged block lookup and the /api/actions response body (plain and gzipped,
+with its ETag) are built once, not per request.
+"""
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
+
+# Block fields that shape normalized workflow_data (and so compiled plans)
+EXECUTION_FIELDS = ("activity_function", "activity_options", "execution", "node_type", "branches")
+
+
+@dataclass(frozen=True)
+class ActionCatalog:
+    """Action blocks plus the pre-rendered catalog response"""
+
+    blocks: Mapping[str, Dict[str, Any]]  # Every block the executor understands, by action ID
+    ui_block_count: int
+    body: bytes
+    gzip_body: bytes
+    etag: str  # Strong ETag of body; the gzipped representation uses etag with a "-gzip" suffix
+    execution_hash: str  # Changes with any block's EXECUTION_FIELDS (UI-only and mock blocks included)
+
+    @property
+    def gzip_etag(self) -> str:
+        return self.etag[:-1] + '-gzip"'
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Check an If-None-Match header against either representation's ETag"""
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or self.etag in tags or self.gzip_etag in tags
+
+
+def _catalog_entry(block_id: str, block_info: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": block_id,
+        "name": block_info["name"],
+        "description": block_info.get("description", ""),
+        "icon": block_info["icon"],
+        "color": block_info["color"],
+        "action_count": block_info["action_count"],
+        "category": block_info["category"],
+        "config_fields": block_info.get("config_fields", []),
+        "branches": block_info.get("branches", [])  # For conditional_router
+    }
+
+
+def build_action_catalog(
+    ui_blocks: Dict[str, Dict[str, Any]],
+    *other_blocks: Dict[str, Dict[str, Any]],
+) -> ActionCatalog:
+    """
+    Build the catalog; call again whenever the block definitions change
+
+    Args:
+        ui_blocks: Blocks offered in the builder palette (/api/actions)
+        other_blocks: Further blocks the executor accepts; ui_blocks win on ID clashes
+    """
+    blocks: Dict[str, Dict[str, Any]] = {}
+    for extra in other_blocks:
+        blocks.update(extra)
+    blocks.update(ui_blocks)
+
+    # Group by category
+    by_category: Dict[str, list] = {}
+    for block_id, block_info in ui_blocks.items():
+        by_category.setdefault(block_info["category"], []).append(_catalog_entry(block_id, block_info))
+
+    body = json.dumps(
+        {"total": len(ui_blocks), "categories": by_category},
+        separators=(",", ":"),
+        ensure_ascii=False,
+    ).encode("utf-8")
+
+    execution_fields = {
+        block_id: {name: block_info[name] for name in EXECUTION_FIELDS if name in block_info}
+        for block_id, block_info in blocks.items()
+    }
+    execution_hash = hashlib.sha256(
+        json.dumps(execution_fields, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+    ).hexdigest()
+
+    return ActionCatalog(
+        blocks=MappingProxyType(blocks),
+        ui_block_count=len(ui_blocks),
+        body=body,
+        gzip_body=gzip.compress(body, compresslevel=9, mtime=0),
+        etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+        execution_hash=execution_hash,
+    )
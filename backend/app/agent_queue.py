@@ -0,0 +1,103 @@
+"""
+Bounded work queue for workflow-agent LLM turns
+Caps concurrent agent turns, serializes turns within a session and rejects
+work once the queue is full, so agent traffic cannot starve the rest of the API.
+"""
+import asyncio
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List
+
+
+class AgentQueueFull(Exception):
+    """Raised when no agent capacity is left; carries the numbers for the 429 response"""
+
+    def __init__(self, queue_depth: int, retry_after_seconds: int):
+        super().__init__(f"Agent queue is full ({queue_depth} turns waiting)")
+        self.queue_depth = queue_depth
+        self.retry_after_seconds = retry_after_seconds
+
+
+class AgentWorkQueue:
+    """At most max_concurrent agent turns run; at most max_waiting more may queue"""
+
+    def __init__(self, max_concurrent: int = 4, max_waiting: int = 16):
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._session_locks: Dict[str, List] = {}  # session_id -> [lock, users]
+        self.active = 0
+        self.waiting = 0
+        self.average_turn_seconds = 10.0  # Moving average, used for Retry-After
+
+    @property
+    def queue_depth(self) -> int:
+        return self.waiting
+
+    def retry_after_seconds(self) -> int:
+        """Rough wait until a slot frees up for a new request"""
+        rounds = (self.waiting + 1) / max(1, self.max_concurrent)
+        return max(1, math.ceil(rounds * self.average_turn_seconds))
+
+    def headers(self) -> Dict[str, str]:
+        """Queue state headers for agent responses"""
+        return {
+            "X-Queue-Depth": str(self.waiting),
+            "X-Queue-Active": str(self.active),
+            "X-Queue-Capacity": str(self.max_concurrent + self.max_waiting),
+        }
+
+    def ensure_capacity(self) -> None:
+        """
+        Check that a new turn could be queued right now
+
+        Raises:
+            AgentQueueFull: if max_concurrent turns are running and max_waiting are queued
+        """
+        if self.active + self.waiting >= self.max_concurrent + self.max_waiting:
+            raise AgentQueueFull(self.waiting, self.retry_after_seconds())
+
+    @asynccontextmanager
+    async def slot(self, session_id: str) -> AsyncIterator[None]:
+        """
+        Hold an agent slot for one turn of session_id
+
+        Raises:
+            AgentQueueFull: if max_concurrent turns are running and max_waiting are queued
+        """
+        self.ensure_capacity()
+
+        entry = self._session_locks.setdefault(session_id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        self.waiting += 1
+        waiting = True
+        try:
+            # One turn at a time per session: turns share (and append to) its history
+            async with entry[0]:
+                async with self._slots:
+                    self.waiting -= 1
+                    waiting = False
+                    self.active += 1
+                    started = time.monotonic()
+                    try:
+                        yield
+                    finally:
+                        self.active -= 1
+                        elapsed = time.monotonic() - started
+                        self.average_turn_seconds = 0.8 * self.average_turn_seconds + 0.2 * elapsed
+        finally:
+            if waiting:
+                self.waiting -= 1
+            entry[1] -= 1
+            if entry[1] == 0:
+                self._session_locks.pop(session_id, None)
+
+
+def create_agent_work_queue() -> AgentWorkQueue:
+    """Queue sized from AGENT_MAX_CONCURRENCY / AGENT_MAX_QUEUE"""
+    return AgentWorkQueue(
+        max_concurrent=int(os.getenv("AGENT_MAX_CONCURRENCY", "4")),
+        max_waiting=int(os.getenv("AGENT_MAX_QUEUE", "16")),
+    )
@@ -0,0 +1,146 @@
+"""
+Data-binding templates between workflow nodes
+Params can reference earlier results with {{node_id.path.to.field}} and run
+metadata with {{workflow.id}} / {{workflow.run_id}} / {{workflow.name}}.
+
+Templates are parsed once when the plan is compiled; at dispatch only the
+referenced fields are copied into the activity's params.
+A param that is exactly one binding keeps the referenced value's type
+(dicts, lists, claim-check references); bindings inside longer strings are
+interpolated as text, which claim-check references cannot be.
+"""
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Mapping, Optional, Tuple, Union
+
+from conditions import BLOB_REF_KEY, get_path
+
+WORKFLOW_SOURCE = "workflow"
+
+_BINDING_PATTERN = re.compile(r"\{\{\s*([A-Za-z0-9_\-]+)((?:\.[A-Za-z0-9_\-]+)*)\s*\}\}")
+
+
+class BindingError(ValueError):
+    """A binding resolved to a value that cannot be used where it appears"""
+
+
+def _contains_blob_ref(value: Any) -> bool:
+    if isinstance(value, dict):
+        return BLOB_REF_KEY in value or any(_contains_blob_ref(child) for child in value.values())
+    if isinstance(value, list):
+        return any(_contains_blob_ref(child) for child in value)
+    return False
+
+
+@dataclass(frozen=True)
+class Binding:
+    """Reference to a node result (or workflow metadata) field"""
+
+    source: str
+    path: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class Template:
+    """Parsed string param: literal text interleaved with bindings"""
+
+    parts: Tuple[Union[str, Binding], ...]
+
+    def render(self, lookup) -> Any:
+        """
+        Raises:
+            BindingError: if a binding inside a longer string resolves to a claim-check reference
+        """
+        if len(self.parts) == 1 and isinstance(self.parts[0], Binding):
+            return lookup(self.parts[0])
+        rendered = []
+        for part in self.parts:
+            if isinstance(part, Binding):
+                value = lookup(part)
+                if _contains_blob_ref(value):
+                    reference = ".".join((part.source,) + part.path)
+                    raise BindingError(
+                        f"{{{{{reference}}}}} is an offloaded (claim-check) value and cannot be "
+                        f"interpolated into text; bind it as the whole param value instead"
+                    )
+                rendered.append("" if value is None else str(value))
+            else:
+                rendered.append(part)
+        return "".join(rendered)
+
+
+def parse_template(text: str) -> Optional[Template]:
+    """Parse a string param; returns None if it contains no bindings"""
+    parts = []
+    position = 0
+    for match in _BINDING_PATTERN.finditer(text):
+        if match.start() > position:
+            parts.append(text[position:match.start()])
+        path = tuple(match.group(2).lstrip(".").split(".")) if match.group(2) else ()
+        parts.append(Binding(source=match.group(1), path=path))
+        position = match.end()
+    if not parts:
+        return None
+    if position < len(text):
+        parts.append(text[position:])
+    return Template(parts=tuple(parts))
+
+
+@dataclass(frozen=True)
+class CompiledParams:
+    """Node params with their binding slots located ahead of time"""
+
+    params: Mapping[str, Any]
+    slots: Tuple[Tuple[Tuple[Any, ...], Template], ...]  # (key path into params, template)
+    references: FrozenSet[str]  # Node IDs whose results the bindings read
+
+    def resolve(self, node_results: Mapping[str, Any], workflow_values: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Build the params for dispatch
+
+        Only containers on the way to a binding are copied; everything else is shared with the template.
+        """
+        def lookup(binding: Binding) -> Any:
+            if binding.source == WORKFLOW_SOURCE:
+                return get_path(workflow_values, binding.path, None)
+            return get_path(node_results.get(binding.source), binding.path, None)
+
+        resolved = dict(self.params)
+        for key_path, template in self.slots:
+            container = resolved
+            for key in key_path[:-1]:
+                child = container[key]
+                child = dict(child) if isinstance(child, dict) else list(child)
+                container[key] = child
+                container = child
+            container[key_path[-1]] = template.render(lookup)
+        return resolved
+
+
+def _find_slots(value: Any, key_path: Tuple[Any, ...], slots: list):
+    if isinstance(value, str):
+        template = parse_template(value)
+        if template:
+            slots.append((key_path, template))
+    elif isinstance(value, dict):
+        for key, child in value.items():
+            _find_slots(child, key_path + (key,), slots)
+    elif isinstance(value, list):
+        for index, child in enumerate(value):
+            _find_slots(child, key_path + (index,), slots)
+
+
+def compile_params(params: Optional[Dict[str, Any]]) -> Optional[CompiledParams]:
+    """Compile a node's params; returns None if they contain no bindings"""
+    slots: list = []
+    _find_slots(params or {}, (), slots)
+    if not slots:
+        return None
+
+    references = frozenset(
+        part.source
+        for _, template in slots
+        for part in template.parts
+        if isinstance(part, Binding) and part.source != WORKFLOW_SOURCE
+    )
+    return CompiledParams(params=params, slots=tuple(slots), references=references)
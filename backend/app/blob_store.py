@@ -0,0 +1,167 @@
+"""
+Blob Storage Module - Out-of-band storage for large workflow payloads
+Local filesystem, SQLite and S3-compatible backends behind one interface
+"""
+import hashlib
+import logging
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def content_key(data: bytes) -> str:
+    """Content-addressed key, so identical payloads are stored once"""
+    return f"sha256-{hashlib.sha256(data).hexdigest()}"
+
+
+class BlobStore(ABC):
+    """Abstract base class for blob storage"""
+
+    @abstractmethod
+    def put(self, key: str, data: bytes) -> None:
+        """Store bytes under a key (overwrites)"""
+        pass
+
+    @abstractmethod
+    def get(self, key: str) -> bytes:
+        """Load bytes for a key, raises KeyError if missing"""
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Delete a blob (no-op if missing)"""
+        pass
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Check whether a blob exists"""
+        pass
+
+
+class LocalBlobStore(BlobStore):
+    """Filesystem blob store (single host / shared volume)"""
+
+    def __init__(self, root: str = "./blob_store"):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        logger.info(f"✅ Local blob store initialized at {self.root}")
+
+    def _path(self, key: str) -> Path:
+        # Fan out into subdirectories to keep directory sizes reasonable
+        return self.root / key[-2:] / key
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+
+    def get(self, key: str) -> bytes:
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            raise KeyError(key)
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).exists()
+
+
+class SQLiteBlobStore(BlobStore):
+    """SQLite blob store (stand-in for an object store in development)"""
+
+    def __init__(self, db_path: str = "./blob_store.db"):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS blobs (key TEXT PRIMARY KEY, data BLOB NOT NULL)")
+        self.conn.commit()
+        self.lock = threading.Lock()
+        logger.info(f"✅ SQLite blob store initialized at {db_path}")
+
+    def put(self, key: str, data: bytes) -> None:
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO blobs (key, data) VALUES (?, ?)", (key, data))
+            self.conn.commit()
+
+    def get(self, key: str) -> bytes:
+        with self.lock:
+            row = self.conn.execute("SELECT data FROM blobs WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return bytes(row[0])
+
+    def delete(self, key: str) -> None:
+        with self.lock:
+            self.conn.execute("DELETE FROM blobs WHERE key = ?", (key,))
+            self.conn.commit()
+
+    def exists(self, key: str) -> bool:
+        with self.lock:
+            row = self.conn.execute("SELECT 1 FROM blobs WHERE key = ?", (key,)).fetchone()
+        return row is not None
+
+
+class S3BlobStore(BlobStore):
+    """S3-compatible blob store (AWS S3, MinIO, ...)"""
+
+    def __init__(self, bucket: str, prefix: str = "workflow-blobs/", endpoint_url: Optional[str] = None):
+        try:
+            import boto3
+            self.client = boto3.client("s3", endpoint_url=endpoint_url)
+            self.bucket = bucket
+            self.prefix = prefix
+            logger.info(f"✅ S3 blob store initialized (bucket: {bucket})")
+        except Exception as e:
+            logger.error(f"❌ Failed to initialize S3 blob store: {e}")
+            raise
+
+    def put(self, key: str, data: bytes) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=self.prefix + key, Body=data)
+
+    def get(self, key: str) -> bytes:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self.prefix + key)
+        except self.client.exceptions.NoSuchKey:
+            raise KeyError(key)
+        return response["Body"].read()
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self.prefix + key)
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.prefix + key)
+            return True
+        except Exception:
+            return False
+
+
+def create_blob_store(backend: str = "local", path: Optional[str] = None, bucket: Optional[str] = None,
+                      endpoint_url: Optional[str] = None) -> Optional[BlobStore]:
+    """
+    Factory function to create a blob store
+
+    Args:
+        backend: "local", "sqlite", "s3" or "none" (disables offloading)
+        path: Directory (local) or database file (sqlite)
+        bucket: S3 bucket name
+        endpoint_url: Custom endpoint for S3-compatible stores
+
+    Returns:
+        BlobStore instance, or None when disabled
+    """
+    if backend == "none":
+        return None
+    if backend == "sqlite":
+        return SQLiteBlobStore(path or "./blob_store.db")
+    if backend == "s3":
+        if not bucket:
+            raise ValueError("S3 blob store requires a bucket")
+        return S3BlobStore(bucket, endpoint_url=endpoint_url)
+    return LocalBlobStore(path or "./blob_store")
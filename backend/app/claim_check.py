@@ -0,0 +1,85 @@
+"""
+Claim-check offloading for activity payloads
+Large result fields are moved to a BlobStore and replaced with small references;
+references in activity params are resolved back to their content in the worker.
+"""
+import asyncio
+import functools
+from typing import Any, Callable
+
+from temporalio import activity
+
+from blob_store import BlobStore, content_key
+
+BLOB_REF_KEY = "$blob"
+DEFAULT_THRESHOLD_BYTES = 32 * 1024
+
+
+def is_blob_ref(value: Any) -> bool:
+    """Check whether a value is a claim-check reference"""
+    return isinstance(value, dict) and BLOB_REF_KEY in value
+
+
+def offload_large_values(value: Any, store: BlobStore, threshold: int = DEFAULT_THRESHOLD_BYTES) -> Any:
+    """
+    Replace string/bytes values at or above threshold bytes with blob references
+
+    Returns:
+        A copy of value with large leaves swapped for {"$blob": key, "size": n, "encoding": ...}
+    """
+    if isinstance(value, dict):
+        if is_blob_ref(value):
+            return value
+        return {k: offload_large_values(v, store, threshold) for k, v in value.items()}
+    if isinstance(value, list):
+        return [offload_large_values(v, store, threshold) for v in value]
+    if isinstance(value, str):
+        data = value.encode("utf-8")
+        encoding = "utf-8"
+    elif isinstance(value, bytes):
+        data = value
+        encoding = "bytes"
+    else:
+        return value
+
+    if len(data) < threshold:
+        return value
+
+    key = content_key(data)
+    if not store.exists(key):
+        store.put(key, data)
+    return {BLOB_REF_KEY: key, "size": len(data), "encoding": encoding}
+
+
+def resolve_blob_refs(value: Any, store: BlobStore) -> Any:
+    """Replace blob references with their stored content"""
+    if isinstance(value, dict):
+        if is_blob_ref(value):
+            data = store.get(value[BLOB_REF_KEY])
+            return data if value.get("encoding") == "bytes" else data.decode("utf-8")
+        return {k: resolve_blob_refs(v, store) for k, v in value.items()}
+    if isinstance(value, list):
+        return [resolve_blob_refs(v, store) for v in value]
+    return value
+
+
+def claim_check_activity(fn: Callable, store: BlobStore, threshold: int = DEFAULT_THRESHOLD_BYTES) -> Callable:
+    """
+    Wrap an activity so its payloads go through the blob store
+
+    Blob references in params are resolved only when an activity receives them,
+    so nodes that never consume the bytes never load them. Large fields in the
+    result are offloaded before the result is recorded in workflow history.
+    """
+    definition = activity._Definition.from_callable(fn)
+    name = definition.name if definition else fn.__name__
+
+    @activity.defn(name=name)
+    @functools.wraps(fn, updated=())  # Skip __dict__: it holds fn's activity definition
+    async def wrapper(params: dict) -> Any:
+        # Store I/O is blocking; keep it off the worker's event loop
+        params = await asyncio.to_thread(resolve_blob_refs, params, store)
+        result = await fn(params)
+        return await asyncio.to_thread(offload_large_values, result, store, threshold)
+
+    return wrapper
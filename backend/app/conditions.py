@@ -0,0 +1,160 @@
+"""
+Condition engine for the Conditional Router block
+Condition specs are compiled once into plain closures, so routing inside the
+workflow is a deterministic function call with no activity round trip.
+
+Spec forms:
+    {"field": "delivery.status", "operator": "equals", "value": "delayed"}
+    {"all": [spec, ...]}   {"any": [spec, ...]}   {"not": spec}
+Router node params may also use the block's flat config fields:
+    {"condition_field": ..., "operator": ..., "condition_value": ...}
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Condition = Callable[[Any], bool]
+
+BLOB_REF_KEY = "$blob"  # claim_check.BLOB_REF_KEY (claim_check is worker-only, not imported here)
+
+_MISSING = object()
+
+
+class ConditionError(ValueError):
+    """A condition cannot be evaluated against the data it was given"""
+
+
+def _split_path(path: str) -> Tuple[str, ...]:
+    if not isinstance(path, str) or not path:
+        raise ValueError(f"Condition field must be a non-empty string, got {path!r}")
+    return tuple(path.split("."))
+
+
+def get_path(data: Any, path: Tuple[str, ...], default: Any = _MISSING, reject_blob_refs: bool = False) -> Any:
+    """
+    Walk a dotted path through nested dicts/lists; returns default if absent
+
+    With reject_blob_refs, meeting a claim-check reference on the way (or at the end)
+    raises ConditionError - workflow code only holds the reference, never the value.
+    """
+    current = data
+    for depth in range(len(path) + 1):
+        if reject_blob_refs and isinstance(current, dict) and BLOB_REF_KEY in current:
+            offloaded = ".".join(path[:depth]) or "the whole result"
+            raise ConditionError(
+                f"Condition field '{'.'.join(path)}' reads {offloaded}, an offloaded (claim-check) "
+                f"value the workflow cannot compare; route on a smaller field instead"
+            )
+        if depth == len(path):
+            break
+        part = path[depth]
+        if isinstance(current, dict):
+            current = current.get(part, _MISSING)
+        elif isinstance(current, list) and part.lstrip("-").isdigit():
+            index = int(part)
+            current = current[index] if -len(current) <= index < len(current) else _MISSING
+        else:
+            return default
+        if current is _MISSING:
+            return default
+    return current
+
+
+def _to_number(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            return None
+    return None
+
+
+def _coerce_like(expected: Any, actual: Any) -> Any:
+    """Coerce a (usually string, from the UI) expected value to the actual value's type"""
+    if isinstance(actual, bool) and isinstance(expected, str):
+        lowered = expected.strip().lower()
+        if lowered in ("true", "false"):
+            return lowered == "true"
+    if isinstance(actual, (int, float)) and not isinstance(actual, bool):
+        number = _to_number(expected)
+        if number is not None:
+            return number
+    return expected
+
+
+def _equals(actual: Any, expected: Any) -> bool:
+    if actual is _MISSING:
+        return False
+    return actual == _coerce_like(expected, actual)
+
+
+def _contains(actual: Any, expected: Any) -> bool:
+    if isinstance(actual, str):
+        return str(expected) in actual
+    if isinstance(actual, (list, tuple, dict)):
+        return expected in actual
+    return False
+
+
+def _compare(op: Callable[[float, float], bool]) -> Callable[[Any, Any], bool]:
+    def compare(actual: Any, expected: Any) -> bool:
+        left, right = _to_number(actual), _to_number(expected)
+        if left is None or right is None:
+            return False
+        return op(left, right)
+    return compare
+
+
+OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "equals": _equals,
+    "not_equals": lambda actual, expected: not _equals(actual, expected),
+    "contains": _contains,
+    "greater_than": _compare(lambda left, right: left > right),
+    "less_than": _compare(lambda left, right: left < right),
+}
+
+
+def compile_condition(spec: Dict[str, Any]) -> Condition:
+    """
+    Compile a condition spec into a predicate over a result dict
+
+    The predicate raises ConditionError if its field is an offloaded (claim-check) value.
+
+    Raises:
+        ValueError: for unknown operators or malformed specs
+    """
+    if not isinstance(spec, dict):
+        raise ValueError(f"Condition must be an object, got {spec!r}")
+
+    if "all" in spec or "any" in spec:
+        combinator = "all" if "all" in spec else "any"
+        children: List[Condition] = [compile_condition(child) for child in spec[combinator]]
+        if combinator == "all":
+            return lambda data: all(child(data) for child in children)
+        return lambda data: any(child(data) for child in children)
+
+    if "not" in spec:
+        child = compile_condition(spec["not"])
+        return lambda data: not child(data)
+
+    operator = spec.get("operator", "equals")
+    if operator not in OPERATORS:
+        raise ValueError(f"Unknown condition operator '{operator}', expected one of {sorted(OPERATORS)}")
+    compare = OPERATORS[operator]
+    path = _split_path(spec.get("field"))
+    expected = spec.get("value")
+
+    return lambda data: compare(get_path(data, path, reject_blob_refs=True), expected)
+
+
+def compile_router_condition(params: Dict[str, Any]) -> Condition:
+    """Compile the condition of a Conditional Router node from its params"""
+    if params.get("condition") is not None:
+        return compile_condition(params["condition"])
+    return compile_condition({
+        "field": params.get("condition_field"),
+        "operator": params.get("operator", "equals"),
+        "value": params.get("condition_value"),
+    })
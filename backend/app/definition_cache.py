@@ -0,0 +1,88 @@
+"""
+Content-hashed caches for workflow definitions
+The API caches normalized definitions and the worker caches compiled plans,
+both keyed by a canonical hash of the definition's nodes and edges.
+
+Imported by workflow code through workflow.unsafe.imports_passed_through(),
+so the plan cache lives once per worker process instead of once per run.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, List, Optional, TypeVar
+
+from workflow_plan import WorkflowPlan, compile_workflow
+
+DEFINITION_HASH_KEY = "definition_hash"
+
+V = TypeVar("V")
+
+
+def canonical_hash(value: Any) -> str:
+    """SHA-256 of value's canonical JSON (sorted keys, no whitespace)"""
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def definition_hash(nodes: List[Dict[str, Any]], edges: List[Dict[str, Any]], *salt: str) -> str:
+    """Hash of a definition's graph (plus e.g. the catalog version it was normalized against)"""
+    return canonical_hash({"nodes": nodes, "edges": edges, "salt": list(salt)})
+
+
+class LRUCache(Generic[V]):
+    """Small thread-safe LRU map (workflow tasks run on a thread pool in the worker)"""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, V]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: V) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_create(self, key: Hashable, create: Callable[[], V]) -> V:
+        value = self.get(key)
+        if value is None:
+            # Built outside the lock; a racing duplicate build is harmless
+            value = create()
+            self.put(key, value)
+        return value
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Compiled plans shared by every run in this worker process
+plan_cache: LRUCache[WorkflowPlan] = LRUCache(maxsize=128)
+
+
+def get_plan(workflow_data: Dict[str, Any]) -> WorkflowPlan:
+    """
+    Compiled plan for workflow_data, reused across runs with the same definition hash
+
+    Definitions without a definition_hash (started outside the API) are compiled every time.
+    Plans are immutable, so sharing one between concurrent runs is safe.
+    """
+    key = workflow_data.get(DEFINITION_HASH_KEY)
+    if not key:
+        return compile_workflow(workflow_data)
+    # Config also feeds the plan (continue-as-new limits)
+    cache_key = (key, canonical_hash(workflow_data.get("config") or {}))
+    return plan_cache.get_or_create(cache_key, lambda: compile_workflow(workflow_data))
@@ -0,0 +1,128 @@
+"""
+Requirement document upload handling
+Uploads are streamed to disk in chunks under a size cap, and parsed in a
+process pool with a timeout, so PyPDF2/docx never run on the API event loop.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from fastapi import UploadFile
+
+logger = logging.getLogger(__name__)
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+class UploadTooLarge(Exception):
+    """Upload exceeded the size cap"""
+
+
+class DocumentParseTimeout(Exception):
+    """Parsing did not finish within the timeout"""
+
+
+async def save_upload(file: UploadFile, suffix: str = "", max_bytes: int = MAX_UPLOAD_BYTES) -> str:
+    """
+    Stream an upload to a temp file, chunk by chunk
+
+    Returns:
+        Path of the temp file (the caller deletes it)
+
+    Raises:
+        UploadTooLarge: as soon as more than max_bytes have been read (the partial file is removed)
+    """
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+                await asyncio.to_thread(out.write, chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+
+def _parse_document(file_path: str) -> str:
+    """Runs in a parser process"""
+    from src.agents.workflow_creation_agent import read_requirement_document
+    return read_requirement_document.invoke({"file_path": file_path})
+
+
+class DocumentParser:
+    """Parses requirement documents in a small process pool"""
+
+    def __init__(self, max_workers: int = 2, timeout_seconds: float = 60.0):
+        self.max_workers = max_workers
+        self.timeout_seconds = timeout_seconds
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn, not fork: the API process runs threads (Temporal bridge, thread pools)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    def _retire(self, pool: ProcessPoolExecutor) -> None:
+        """Replace pool for later parses and kill its workers (shutdown alone never stops a stuck one)"""
+        if self._pool is pool:
+            self._pool = None
+        # No public API reaches the worker processes; snapshot them before shutdown clears the map
+        processes = list((pool._processes or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    async def parse(self, file_path: str) -> str:
+        """
+        Extract the text of a Word/PDF document
+
+        Raises:
+            DocumentParseTimeout: if parsing takes longer than timeout_seconds
+        """
+        for attempt in range(2):
+            pool = self._get_pool()
+            future = asyncio.get_running_loop().run_in_executor(pool, _parse_document, file_path)
+            try:
+                return await asyncio.wait_for(future, timeout=self.timeout_seconds)
+            except asyncio.TimeoutError:
+                # The worker is stuck in the parser: kill the pool so later uploads get fresh workers
+                logger.warning(f"⚠️  Parsing {file_path} timed out after {self.timeout_seconds}s, replacing parser pool")
+                self._retire(pool)
+                raise DocumentParseTimeout(f"Document parsing timed out after {self.timeout_seconds:g} seconds")
+            except BrokenProcessPool:
+                # Another parse's timeout (or a crashed worker) took this pool down: retry once on a fresh one
+                if self._pool is pool:
+                    self._retire(pool)
+                if attempt:
+                    raise
+                logger.warning(f"⚠️  Parser pool broke while parsing {file_path}, retrying")
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._retire(self._pool)
+
+
+def create_document_parser() -> DocumentParser:
+    """Parser sized from DOCUMENT_PARSE_WORKERS / DOCUMENT_PARSE_TIMEOUT_SECONDS"""
+    return DocumentParser(
+        max_workers=int(os.getenv("DOCUMENT_PARSE_WORKERS", "2")),
+        timeout_seconds=float(os.getenv("DOCUMENT_PARSE_TIMEOUT_SECONDS", "60")),
+    )
@@ -3,10 +3,25 @@ Enhanced Dynamic Workflow Executor for Visual Workflow Builder
 Supports conditional routing based on activity results (e.g., email parsing completeness)
 """
 import asyncio
+from collections import deque
 from datetime import timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
 from temporalio import workflow
-from temporalio.common import RetryPolicy
+from temporalio.exceptions import ApplicationError
+
+# Pure, deterministic modules passed through the sandbox, so compiled plans
+# cached in definition_cache are shared by every run in this worker
+with workflow.unsafe.imports_passed_through():
+    from bindings import BindingError
+    from conditions import ConditionError, get_path
+    from definition_cache import get_plan
+    from inline_actions import INLINE_ACTIONS
+    from workflow_plan import PARAM_OVERRIDES_KEY, ReplyWait, WorkflowPlan
+
+_ABSENT = object()
+
+EVENT_BUFFER_SIZE = 256  # Progress events kept for get_events (older ones are dropped)
+TERMINAL_EVENTS = ("workflow_completed", "workflow_failed")
 
 
 class WorkflowState:
@@ -15,33 +30,143 @@ class WorkflowState:
     def __init__(self):
         self.node_results: Dict[str, Any] = {}
         self.execution_path: List[str] = []  # Track which nodes were executed
+        self.pending_replies: List[Dict[str, Any]] = []  # reply_received signals not yet consumed by a node
+        self.running_nodes: List[str] = []  # Nodes executing right now (several with parallel branches)
+        self.step_count = 0  # Steps in this run (resets on continue-as-new)
+        self.total_steps = 0  # Steps across all continued runs
+        self.continuations = 0
+        self.events: deque = deque(maxlen=EVENT_BUFFER_SIZE)  # Progress events for live streaming
+        self.event_seq = 0  # Sequence number of the last event (continues across runs)
 
     def set_node_result(self, node_id: str, result: Any):
         """Store result of a node execution"""
         self.node_results[node_id] = result
         self.execution_path.append(node_id)
+        self.step_count += 1
+        self.total_steps += 1
+
+    def snapshot(self, node_id: str, previous_node_id: Optional[str], keep_results: List[str]) -> Dict[str, Any]:
+        """Compact state carried into a continued run"""
+        return {
+            "node_id": node_id,
+            "previous_node_id": previous_node_id,
+            "total_steps": self.total_steps,
+            "continuations": self.continuations + 1,
+            "pending_replies": self.pending_replies,
+            "event_seq": self.event_seq,
+            "events": list(self.events),
+            "node_results": {
+                node: self.node_results[node] for node in keep_results if node in self.node_results
+            },
+        }
+
+    def restore(self, snapshot: Dict[str, Any]):
+        """Restore state from a snapshot made by the previous run"""
+        self.node_results = dict(snapshot.get("node_results", {}))
+        self.total_steps = snapshot.get("total_steps", 0)
+        self.continuations = snapshot.get("continuations", 0)
+        self.events.extend(snapshot.get("events", []))
+        self.event_seq = snapshot.get("event_seq", self.event_seq)
+        # Signals can be delivered to the new run before run() restores the snapshot
+        self.pending_replies = list(snapshot.get("pending_replies", [])) + self.pending_replies
+
+    def record_event(self, event_type: str, at: str, **fields: Any) -> Dict[str, Any]:
+        """Append a progress event (node_started, node_completed, route_taken, ...)"""
+        self.event_seq += 1
+        event = {"seq": self.event_seq, "type": event_type, "at": at, **fields}
+        self.events.append(event)
+        return event
+
+    def events_after(self, after_seq: int) -> Dict[str, Any]:
+        """
+        Events with seq greater than after_seq
+
+        Returns:
+            {"events": [...], "last_seq": int, "dropped": bool} - dropped is True if
+            events after after_seq have already left the buffer
+        """
+        events = [event for event in self.events if event["seq"] > after_seq]
+        oldest = self.events[0]["seq"] if self.events else self.event_seq + 1
+        return {
+            "events": events,
+            "last_seq": self.event_seq,
+            "dropped": after_seq < oldest - 1,
+        }
+
+    def take_reply(self, matches) -> Optional[Dict[str, Any]]:
+        """Remove and return the oldest pending reply accepted by matches"""
+        for index, reply in enumerate(self.pending_replies):
+            if matches(reply):
+                return self.pending_replies.pop(index)
+        return None
 
     def get_node_result(self, node_id: str) -> Any:
         """Get result of a node"""
         return self.node_results.get(node_id)
 
+    def view(self, selector: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Projected, paged view of node results
 
-def get_node_by_id(nodes: List[Dict], node_id: str) -> Optional[Dict]:
-    """Get node by ID"""
-    for node in nodes:
-        if node.get("id") == node_id:
-            return node
-    return None
-
+        Args:
+            selector: {
+                "nodes": [node_id] - only these nodes (default: all, in first-execution order),
+                "fields": [dotted.path] - only these fields of each result (default: whole result),
+                "offset": int, "limit": int - page over the selected nodes,
+                "include_path": bool - also return execution_path
+            }
+        """
+        node_ids = selector.get("nodes") or list(self.node_results)
+        node_ids = [node_id for node_id in node_ids if node_id in self.node_results]
+        offset = max(0, int(selector.get("offset", 0)))
+        limit = selector.get("limit")
+        # At least one node per page, so next_offset always advances
+        page = node_ids[offset:offset + max(1, int(limit))] if limit is not None else node_ids[offset:]
+
+        fields = selector.get("fields")
+        paths = [tuple(field.split(".")) for field in fields] if fields else None
+
+        results: Dict[str, Any] = {}
+        for node_id in page:
+            result = self.node_results[node_id]
+            if paths is not None and isinstance(result, dict):
+                projected = {}
+                for field, path in zip(fields, paths):
+                    value = get_path(result, path, _ABSENT)
+                    if value is not _ABSENT:
+                        projected[field] = value
+                result = projected
+            results[node_id] = result
+
+        next_offset = offset + len(page)
+        view = {
+            "node_results": results,
+            "total_nodes": len(node_ids),
+            "offset": offset,
+            "next_offset": next_offset if next_offset < len(node_ids) else None,
+        }
+        if selector.get("include_path"):
+            view["execution_path"] = self.execution_path
+        return view
+
+    def summary(self) -> Dict[str, Any]:
+        """Compact progress: running nodes, path, counters and per-node status"""
+        node_status = {}
+        for node_id, result in self.node_results.items():
+            status = result.get("status") if isinstance(result, dict) else None
+            node_status[node_id] = status or "completed"
+        for node_id in self.running_nodes:
+            node_status[node_id] = "running"
 
-def get_outgoing_edges(edges: List[Dict], source_id: str, edge_label: Optional[str] = None) -> List[Dict]:
-    """Get all edges going out from a source node, optionally filtered by label"""
-    outgoing = []
-    for edge in edges:
-        if edge.get("source") == source_id:
-            if edge_label is None or edge.get("label") == edge_label:
-                outgoing.append(edge)
-    return outgoing
+        return {
+            "current_nodes": list(self.running_nodes),
+            "execution_path": self.execution_path,
+            "step_count": self.step_count,
+            "total_steps": self.total_steps,
+            "continuations": self.continuations,
+            "pending_replies": len(self.pending_replies),
+            "node_status": node_status,
+        }
 
 
 @workflow.defn
@@ -53,14 +178,47 @@ class VisualWorkflowExecutor:
 
     def __init__(self):
         self.state = WorkflowState()
+        self.plan: Optional[WorkflowPlan] = None
+        self.workflow_data: Dict[str, Any] = {}
+        self.param_overrides: Dict[str, Dict[str, Any]] = {}
+        # Branch tasks a fan-out cancelled itself (wait-any / first-N losers)
+        self._cancelled_branches: Set[asyncio.Task] = set()
 
     @workflow.query
-    def get_state(self) -> Dict[str, Any]:
-        """Query current workflow state"""
-        return {
-            "node_results": self.state.node_results,
-            "execution_path": self.state.execution_path
-        }
+    def get_state(self, selector: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Query current workflow state
+
+        Without a selector returns every node result (can be large); pass a
+        selector (see WorkflowState.view) for field projection, node filters and paging.
+        """
+        if selector is None:
+            return {
+                "node_results": self.state.node_results,
+                "execution_path": self.state.execution_path
+            }
+        return self.state.view(selector)
+
+    @workflow.query
+    def get_summary(self) -> Dict[str, Any]:
+        """Query compact progress (no node results) - cheap enough for dashboards to poll"""
+        return self.state.summary()
+
+    @workflow.query
+    def get_events(self, after_seq: int = 0) -> Dict[str, Any]:
+        """Query progress events newer than after_seq (see WorkflowState.events_after)"""
+        return self.state.events_after(after_seq)
+
+    @workflow.signal
+    def reply_received(self, reply: Dict[str, Any]):
+        """
+        Deliver an email reply to the workflow
+
+        Args:
+            reply: Message reference, e.g. {"message_id", "from_email", "subject", "received_at"}
+        """
+        workflow.logger.info(f"Reply received: {reply.get('message_id')} from {reply.get('from_email')}")
+        self.state.pending_replies.append(reply)
 
     @workflow.run
     async def run(self, workflow_data: Dict[str, Any]) -> Any:
@@ -69,96 +227,300 @@ class VisualWorkflowExecutor:
 
         Args:
             workflow_data: JSON workflow definition with nodes and edges
+                (plus a "resume" snapshot when continued from a previous run)
 
         Returns:
             Final workflow result with execution state
         """
         workflow.logger.info(f"Starting visual workflow execution")
 
-        nodes = workflow_data.get("nodes", [])
-        edges = workflow_data.get("edges", [])
+        # Index nodes and edges once (or reuse the plan of an identical definition);
+        # every step below is a dict lookup
+        self.plan = get_plan(workflow_data)
+        self.workflow_data = workflow_data
+        self.param_overrides = workflow_data.get(PARAM_OVERRIDES_KEY) or {}
 
-        if not nodes:
-            raise ValueError("Workflow has no nodes")
+        resume = workflow_data.get("resume")
+        try:
+            if resume:
+                self.state.restore(resume)
+                workflow.logger.info(
+                    f"Continuing at node {resume['node_id']} "
+                    f"(continuation #{self.state.continuations}, {self.state.total_steps} steps so far)"
+                )
+                await self._run_path(resume["node_id"], resume.get("previous_node_id"))
+            else:
+                self._record_event("workflow_started", node_id=self.plan.start_node_id)
+                await self._run_path(self.plan.start_node_id)
+        except Exception as e:
+            self._record_event("workflow_failed", error=str(e))
+            raise
 
-        # Find start node (first action node or trigger)
-        current_node_id = nodes[0].get("id") if nodes else None
+        workflow.logger.info(f"Workflow completed. Execution path: {' → '.join(self.state.execution_path)}")
+        self._record_event("workflow_completed", total_steps=self.state.total_steps)
+
+        return {
+            "status": "completed",
+            "execution_path": self.state.execution_path,
+            "final_results": self.state.node_results,
+            "total_steps": self.state.total_steps,
+            "continuations": self.state.continuations,
+        }
 
-        if not current_node_id:
-            raise ValueError("Workflow has no start node")
+    def _record_event(self, event_type: str, **fields: Any):
+        """Record a progress event stamped with workflow time"""
+        self.state.record_event(event_type, workflow.now().isoformat(), **fields)
+
+    def _workflow_values(self) -> Dict[str, Any]:
+        """Values available to {{workflow.*}} bindings"""
+        info = workflow.info()
+        return {
+            "id": info.workflow_id,
+            "run_id": info.run_id,
+            "name": self.workflow_data.get("name"),
+        }
+
+    def _should_continue_as_new(self) -> bool:
+        """Check the step and history-size limits for the current run"""
+        if self.state.step_count >= self.plan.continue_as_new_steps:
+            return True
+        info = workflow.info()
+        return info.get_current_history_length() >= self.plan.max_history_events or info.is_continue_as_new_suggested()
+
+    def _continue_as_new(self, next_node_id: str, previous_node_id: Optional[str]):
+        """Restart as a fresh run that picks up at next_node_id"""
+        # Results still readable later: the previous node (auto-fill) and anything a binding references
+        keep_results = sorted(self.plan.referenced_nodes | ({previous_node_id} if previous_node_id else set()))
+        self._record_event("continued_as_new", node_id=next_node_id, continuation=self.state.continuations + 1)
+        snapshot = self.state.snapshot(next_node_id, previous_node_id, keep_results)
+        workflow.logger.info(
+            f"Continuing as new before node {next_node_id} after {self.state.step_count} steps "
+            f"(history length {workflow.info().get_current_history_length()})"
+        )
+        workflow.continue_as_new({**self.workflow_data, "resume": snapshot})
+
+    async def _run_path(
+        self,
+        start_node_id: str,
+        previous_node_id: Optional[str] = None,
+        in_branch: bool = False,
+    ) -> Optional[str]:
+        """
+        Execute nodes from start_node_id until the path ends
+
+        Branch walks (spawned by a fan-out) stop when they reach a join node and
+        return its ID so the fan-out can decide when the join fires.
+        """
+        current_node_id = start_node_id
+        join_result = None
 
-        # Execute nodes
         while current_node_id:
-            node = get_node_by_id(nodes, current_node_id)
+            join = self.plan.joins.get(current_node_id)
+            if join and in_branch and join_result is None:
+                return current_node_id
+
+            node = self.plan.get_node(current_node_id)
             if not node:
                 workflow.logger.warning(f"Node not found: {current_node_id}, ending workflow")
                 break
 
             node_label = node.get("label", node.get("id"))
-            workflow.logger.info(f"Executing node: {node_label} (ID: {current_node_id})")
 
-            # Execute node and get result
-            try:
-                result = await self._execute_node(node)
+            if join:
+                # Join nodes have no activity; record which branches made it
+                result = join_result or {"status": "joined", "mode": join.mode, "branches": [previous_node_id]}
+                join_result = None
                 self.state.set_node_result(current_node_id, result)
-                workflow.logger.info(f"Node {node_label} completed successfully")
-            except Exception as e:
-                workflow.logger.error(f"Node {node_label} failed: {str(e)}")
-                self.state.set_node_result(current_node_id, {"error": str(e), "status": "failed"})
-                # Continue to next node or fail based on error handling policy
-                raise
+                self._record_event("join_fired", node_id=current_node_id, branches=result["branches"])
+                workflow.logger.info(f"Join {node_label} fired ({result['mode']})")
+            else:
+                workflow.logger.info(f"Executing node: {node_label} (ID: {current_node_id})")
+
+                # Execute node and get result
+                self.state.running_nodes.append(current_node_id)
+                self._record_event("node_started", node_id=current_node_id, label=node_label, activity=node.get("activity"))
+                try:
+                    result = await self._execute_node(node, previous_node_id)
+                    self.state.set_node_result(current_node_id, result)
+                    status = result.get("status") if isinstance(result, dict) else None
+                    self._record_event("node_completed", node_id=current_node_id, status=status or "completed")
+                    workflow.logger.info(f"Node {node_label} completed successfully")
+                except Exception as e:
+                    if asyncio.current_task() in self._cancelled_branches:
+                        # Cancelled activities surface as ActivityError, not CancelledError
+                        workflow.logger.info(f"Node {node_label} cancelled: its branch lost the join")
+                        self.state.set_node_result(current_node_id, {"status": "cancelled"})
+                        self._record_event("node_cancelled", node_id=current_node_id)
+                        raise
+                    workflow.logger.error(f"Node {node_label} failed: {str(e)}")
+                    self.state.set_node_result(current_node_id, {"error": str(e), "status": "failed"})
+                    self._record_event("node_failed", node_id=current_node_id, error=str(e))
+                    # Continue to next node or fail based on error handling policy
+                    raise
+                finally:
+                    self.state.running_nodes.remove(current_node_id)
+
+            previous_node_id = current_node_id
 
             # Determine next node based on edges and result
-            current_node_id = await self._get_next_node(current_node_id, result, edges, nodes)
+            routes = self.plan.get_routes(current_node_id)
+            if routes.fan_out:
+                current_node_id, join_result = await self._fan_out(current_node_id, routes.targets)
+            else:
+                current_node_id = await self._get_next_node(current_node_id, result)
 
-        workflow.logger.info(f"Workflow completed. Execution path: {' → '.join(self.state.execution_path)}")
+            # Long-running loops restart with a compact snapshot to bound history and replay cost.
+            # Only the main path does this, and never between a fan-out and its join.
+            if current_node_id and not in_branch and join_result is None and self._should_continue_as_new():
+                self._continue_as_new(current_node_id, previous_node_id)
 
-        return {
-            "status": "completed",
-            "execution_path": self.state.execution_path,
-            "final_results": self.state.node_results
+        return None
+
+    async def _fan_out(self, source_id: str, targets: Tuple[str, ...]) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Run the subgraphs behind each target concurrently and wait for their join
+
+        Returns:
+            (join_node_id, join_result) or (None, None) if every branch ended without reaching a join
+        """
+        workflow.logger.info(f"Fanning out from {source_id} to {len(targets)} branches: {', '.join(targets)}")
+        self._record_event("fan_out", node_id=source_id, targets=list(targets))
+
+        arrivals: List[Tuple[str, str]] = []  # (branch start node, join node) in arrival order
+        errors: List[Exception] = []
+        finished = 0
+
+        async def run_branch(target: str):
+            nonlocal finished
+            try:
+                join_id = await self._run_path(target, source_id, in_branch=True)
+                if join_id:
+                    arrivals.append((target, join_id))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if asyncio.current_task() not in self._cancelled_branches:
+                    errors.append(e)
+            finally:
+                finished += 1
+
+        def join_ready() -> bool:
+            if errors or finished == len(targets):
+                return True
+            if not arrivals:
+                return False
+            join = self.plan.joins[arrivals[0][1]]
+            return len(arrivals) >= join.quorum(len(targets))
+
+        tasks = [asyncio.create_task(run_branch(target)) for target in targets]
+
+        def cancel_running() -> List[str]:
+            running = [target for target, task in zip(targets, tasks) if not task.done()]
+            for task in tasks:
+                if not task.done():
+                    self._cancelled_branches.add(task)
+                    task.cancel()
+            return running
+
+        try:
+            await workflow.wait_condition(join_ready)
+        except asyncio.CancelledError:
+            # This fan-out is itself inside a cancelled branch: take its branches down too
+            cancel_running()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        # wait-any / first-N: branches still running are no longer needed
+        cancelled = cancel_running()
+        try:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            self._cancelled_branches.difference_update(tasks)
+
+        if errors:
+            raise errors[0]
+
+        if not arrivals:
+            workflow.logger.info(f"All branches from {source_id} ended without reaching a join")
+            return None, None
+
+        join_id = arrivals[0][1]
+        join = self.plan.joins[join_id]
+        stray = [target for target, arrived_at in arrivals if arrived_at != join_id]
+        if stray:
+            workflow.logger.warning(f"Branches {stray} reached a different join than {join_id}, ignoring them")
+
+        return join_id, {
+            "status": "joined",
+            "mode": join.mode,
+            "branches": [target for target, arrived_at in arrivals if arrived_at == join_id],
+            "cancelled": cancelled,
         }
 
-    async def _execute_node(self, node: Dict[str, Any]) -> Any:
+    async def _execute_node(self, node: Dict[str, Any], previous_node_id: Optional[str] = None) -> Any:
         """Execute a single node"""
         activity_name = node.get("activity")
-        params = node.get("params", {}).copy()  # Make a copy to avoid mutating template
+
+        # Fill {{node_id.field}} / {{workflow.id}} bindings (parsed at compile time)
+        compiled_params = self.plan.bindings.get(node["id"])
+        if compiled_params:
+            try:
+                params = compiled_params.resolve(self.state.node_results, self._workflow_values())
+            except BindingError as e:
+                # Deterministic: fail the node instead of the workflow task
+                raise ApplicationError(str(e), type="BindingError", non_retryable=True)
+        else:
+            params = node.get("params", {}).copy()  # Make a copy to avoid mutating template
+
+        # Per-instance overrides (batch starts) - literal values on top of the definition's params
+        overrides = self.param_overrides.get(node["id"])
+        if overrides:
+            params = {**params, **overrides}
 
         if not activity_name:
             workflow.logger.warning(f"Node {node.get('id')} has no activity, skipping")
             return {"status": "skipped"}
 
+        # Conditional Router: evaluate the compiled condition against the previous node's result
+        router = self.plan.routers.get(node["id"])
+        if router:
+            previous_result = self.state.get_node_result(previous_node_id) if previous_node_id else None
+            try:
+                condition_met = router.condition(previous_result)
+            except ConditionError as e:
+                # Deterministic: fail the node instead of the workflow task
+                raise ApplicationError(str(e), type="ConditionError", non_retryable=True)
+            workflow.logger.info(f"Condition on {node['id']} evaluated to {condition_met}")
+            return {"status": "true" if condition_met else "false", "condition_met": condition_met}
+
         # Auto-populate parameters from previous node results
         # This allows data to flow between activities automatically
-        if self.state.execution_path:
-            last_node_id = self.state.execution_path[-1] if self.state.execution_path else None
-            if last_node_id and last_node_id in self.state.node_results:
+        # (legacy special cases - explicit {{bindings}} in params take precedence)
+        # Use the previous node on this path: with parallel branches the last
+        # entry in execution_path may belong to another branch
+        if previous_node_id:
+            last_node_id = previous_node_id
+            if last_node_id in self.state.node_results:
                 previous_result = self.state.node_results[last_node_id]
                 if isinstance(previous_result, dict):
                     # Special handling for document extraction workflow
-                    if activity_name == 'extract_data_from_pdf' and 'pdf_base64' in previous_result:
+                    if activity_name == 'extract_data_from_pdf' and 'pdf_base64' in previous_result and not params.get('pdf_base64'):
                         # Auto-fill pdf_base64 from previous extract_document_from_email activity
+                        # (usually a claim-check reference; the worker resolves it to the bytes)
                         params['pdf_base64'] = previous_result['pdf_base64']
                         workflow.logger.info(f"Auto-filled pdf_base64 from previous node: {last_node_id}")
 
                     # Auto-fill workflow_id and extracted_data for save_extraction_as_markdown
                     if activity_name == 'save_extraction_as_markdown':
-                        if 'extracted_data' in previous_result:
+                        if 'extracted_data' in previous_result and not params.get('extracted_data'):
                             params['extracted_data'] = previous_result['extracted_data']
                             workflow.logger.info(f"Auto-filled extracted_data from previous node: {last_node_id}")
                         if 'workflow_id' not in params:
                             params['workflow_id'] = workflow.info().workflow_id
                             workflow.logger.info(f"Auto-filled workflow_id: {params['workflow_id']}")
 
-        # Activity execution options
-        activity_options = {
-            "start_to_close_timeout": timedelta(seconds=120),
-            "retry_policy": RetryPolicy(
-                maximum_attempts=3,
-                initial_interval=timedelta(seconds=1),
-                maximum_interval=timedelta(seconds=10),
-            ),
-        }
+        # Activity execution options (per node, compiled from the definition and catalog defaults)
+        activity_options = self.plan.get_activity_options(node["id"])
 
         # Special handling for wait_for_duration
         if activity_name == "wait_for_duration":
@@ -193,9 +555,35 @@ class VisualWorkflowExecutor:
                 await workflow.sleep(wait_seconds)
             return {"status": "completed", "waited_seconds": wait_seconds}
 
+        # Wait for a reply_received signal (no inbox polling) with a timeout branch
+        reply_wait = self.plan.reply_waits.get(node["id"])
+        if reply_wait:
+            return await self._wait_for_reply(node["id"], reply_wait)
+
+        execution_mode = self.plan.get_execution_mode(node["id"])
+
+        # Deterministic actions run in workflow code - no task queue, no activity events
+        if execution_mode == "inline":
+            workflow.logger.info(f"Executing inline action: {activity_name}")
+            try:
+                return INLINE_ACTIONS[activity_name](params, workflow.now())
+            except Exception as e:
+                # A plain exception here would fail the workflow task and retry it forever.
+                # Inline actions are deterministic, so retrying the same input cannot help.
+                raise ApplicationError(
+                    f"Inline action {activity_name} failed: {e}",
+                    type=type(e).__name__,
+                    non_retryable=True,
+                )
+
         # Execute activity
-        workflow.logger.info(f"Executing activity: {activity_name}")
+        workflow.logger.info(f"Executing activity: {activity_name} ({execution_mode})")
         try:
+            if execution_mode == "local":
+                # Local activities run in this worker and cannot heartbeat
+                local_options = {k: v for k, v in activity_options.items() if k != "heartbeat_timeout"}
+                return await workflow.execute_local_activity(activity_name, params, **local_options)
+
             result = await workflow.execute_activity(
                 activity_name,
                 params,
@@ -206,73 +594,48 @@ class VisualWorkflowExecutor:
             workflow.logger.error(f"Activity {activity_name} failed: {str(e)}")
             raise
 
-    async def _get_next_node(
-        self,
-        current_node_id: str,
-        current_result: Any,
-        edges: List[Dict],
-        nodes: List[Dict]
-    ) -> Optional[str]:
+    async def _wait_for_reply(self, node_id: str, reply_wait: ReplyWait) -> Dict[str, Any]:
+        """Block until a matching reply signal arrives or the node's timeout elapses"""
+        workflow.logger.info(f"Waiting up to {reply_wait.timeout_seconds} seconds for a reply on {node_id}")
+        started_at = workflow.now()
+
+        def reply_pending() -> bool:
+            return any(reply_wait.matches(reply) for reply in self.state.pending_replies)
+
+        # Loop: a parallel branch waiting on the same reply may take it first
+        while True:
+            reply = self.state.take_reply(reply_wait.matches)
+            if reply is not None:
+                break
+            remaining = reply_wait.timeout_seconds - (workflow.now() - started_at).total_seconds()
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                await workflow.wait_condition(reply_pending, timeout=timedelta(seconds=remaining))
+            except asyncio.TimeoutError:
+                workflow.logger.info(f"No reply for {node_id} within {reply_wait.timeout_seconds} seconds")
+                return {"status": "timeout", "waited_seconds": reply_wait.timeout_seconds}
+
+        return {
+            "status": "replied",
+            "reply": reply,
+            "waited_seconds": (workflow.now() - started_at).total_seconds(),
+        }
+
+    async def _get_next_node(self, current_node_id: str, current_result: Any) -> Optional[str]:
         """
         Determine the next node to execute based on current result and edges
         Supports conditional routing based on activity results
         """
-        # Get all outgoing edges from current node
-        outgoing_edges = get_outgoing_edges(edges, current_node_id)
+        next_node_id, reason = self.plan.route(current_node_id, current_result)
+        if next_node_id is not None:
+            self._record_event("route_taken", node_id=current_node_id, target=next_node_id, reason=reason)
 
-        if not outgoing_edges:
+        if next_node_id is None:
             workflow.logger.info(f"No outgoing edges from {current_node_id}, workflow ending")
-            return None
-
-        # If there's only one edge, follow it
-        if len(outgoing_edges) == 1:
-            return outgoing_edges[0].get("target")
-
-        # Multiple edges - need to determine which path to take based on result
-        # Check if current result has routing information
-        if isinstance(current_result, dict):
-            # Check for completeness field (email parsing)
-            completeness = current_result.get("completeness")
-            is_gibberish = current_result.get("is_gibberish", False)
-
-            if completeness:
-                workflow.logger.info(f"Routing based on completeness: {completeness}, is_gibberish: {is_gibberish}")
-
-                # Map completeness to edge labels
-                # If gibberish or incomplete, route to escalation
-                if completeness == "complete" and not is_gibberish:
-                    route_edges = get_outgoing_edges(edges, current_node_id, "complete")
-                elif completeness == "partial" and not is_gibberish:
-                    route_edges = get_outgoing_edges(edges, current_node_id, "partial")
-                else:  # incomplete or gibberish
-                    # Try to find edge with label "incomplete/gibberish" or just "incomplete" or "gibberish"
-                    route_edges = get_outgoing_edges(edges, current_node_id, "incomplete/gibberish")
-                    if not route_edges:
-                        route_edges = get_outgoing_edges(edges, current_node_id, "incomplete")
-                    if not route_edges:
-                        route_edges = get_outgoing_edges(edges, current_node_id, "gibberish")
-
-                if route_edges:
-                    next_node_id = route_edges[0].get("target")
-                    workflow.logger.info(f"Taking '{completeness}' path to node {next_node_id}")
-                    return next_node_id
-                else:
-                    workflow.logger.warning(f"No matching edge found for completeness='{completeness}', is_gibberish={is_gibberish}, falling through to default")
-
-            # Check for status field
-            status = current_result.get("status")
-            if status:
-                workflow.logger.info(f"Routing based on status: {status}")
-
-                # Try to find edge with matching label
-                for edge in outgoing_edges:
-                    if edge.get("label") == status:
-                        next_node_id = edge.get("target")
-                        workflow.logger.info(f"Taking '{status}' path to node {next_node_id}")
-                        return next_node_id
-
-        # Default: take first edge (no label or no match)
-        default_edge = outgoing_edges[0]
-        next_node_id = default_edge.get("target")
-        workflow.logger.info(f"Taking default path to node {next_node_id}")
+        elif reason == "default":
+            workflow.logger.info(f"Taking default path to node {next_node_id}")
+        elif reason != "single":
+            workflow.logger.info(f"Taking '{reason}' path to node {next_node_id}")
+
         return next_node_id
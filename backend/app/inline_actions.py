@@ -0,0 +1,44 @@
+"""
+Deterministic actions executed inline in workflow code
+Pure ports of cheap activities - no task-queue round trip and no activity history events.
+Must stay deterministic: no I/O, no randomness, time only via the `now` argument.
+"""
+from datetime import datetime
+from typing import Any, Callable, Dict
+
+
+def check_escalation_limit(params: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """Inline version of fourkites_actions.check_escalation_limit"""
+    escalation_count = params.get("escalation_count", 0)
+    max_escalations = params.get("max_escalations", 2)
+
+    limit_reached = escalation_count >= max_escalations
+
+    return {
+        "limit_reached": limit_reached,
+        "escalation_count": escalation_count,
+        "max_escalations": max_escalations,
+        "decision_branch": "limit_reached" if limit_reached else "continue",
+        "checked_at": now.isoformat(),
+        "action_count": 1,
+        "status": "checked"
+    }
+
+
+def increment_escalation_counter(params: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """Inline version of fourkites_actions.increment_escalation_counter"""
+    current_count = params.get("current_count", 0)
+
+    return {
+        "previous_count": current_count,
+        "new_count": current_count + 1,
+        "incremented_at": now.isoformat(),
+        "action_count": 1,
+        "status": "incremented"
+    }
+
+
+INLINE_ACTIONS: Dict[str, Callable[[Dict[str, Any], datetime], Dict[str, Any]]] = {
+    "check_escalation_limit": check_escalation_limit,
+    "increment_escalation_counter": increment_escalation_counter,
+}
@@ -0,0 +1,79 @@
+"""
+Binary codec for stored conversation messages
+LangChain's message dict form packed with msgpack, zstd-compressed when large
+(and zstandard is installed), behind a one-byte schema version header.
+"""
+from typing import Any, List
+
+import msgpack
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    from langchain_core.messages import BaseMessage, messages_from_dict, messages_to_dict
+except ImportError:
+    BaseMessage = None
+
+SCHEMA_VERSION = 1
+
+# Second header byte
+PLAIN = 0
+ZSTD = 1
+
+COMPRESS_MIN_BYTES = 1024
+ZSTD_LEVEL = 3
+
+
+def encode_messages(messages: List[Any], compress: bool = True) -> bytes:
+    """
+    Encode a conversation (or a slice of one)
+
+    LangChain messages are stored in their dict form so they decode back to the
+    same message classes; other values (plain dicts from older clients) are packed as-is.
+    """
+    if BaseMessage is not None and messages and all(isinstance(m, BaseMessage) for m in messages):
+        payload = {"messages": messages_to_dict(messages)}
+    else:
+        payload = {"raw": messages}
+    packed = msgpack.packb(payload, use_bin_type=True, default=str)
+
+    if compress and zstandard is not None and len(packed) >= COMPRESS_MIN_BYTES:
+        return bytes((SCHEMA_VERSION, ZSTD)) + zstandard.compress(packed, ZSTD_LEVEL)
+    return bytes((SCHEMA_VERSION, PLAIN)) + packed
+
+
+def decode_messages(data: bytes) -> List[Any]:
+    """
+    Inverse of encode_messages
+
+    Raises:
+        ValueError: for an unknown schema version or compression flag
+    """
+    if len(data) < 2 or data[0] != SCHEMA_VERSION:
+        raise ValueError(f"Unsupported message encoding (version byte {data[:1]!r})")
+    if data[1] == ZSTD:
+        if zstandard is None:
+            raise ValueError("Message is zstd-compressed but zstandard is not installed")
+        packed = zstandard.decompress(data[2:])
+    elif data[1] == PLAIN:
+        packed = data[2:]
+    else:
+        raise ValueError(f"Unknown message compression flag {data[1]}")
+
+    payload = msgpack.unpackb(packed, raw=False, strict_map_key=False)
+    if "messages" in payload:
+        return messages_from_dict(payload["messages"])
+    return payload["raw"]
+
+
+def encode_message(message: Any, compress: bool = True) -> bytes:
+    """Encode one message (an entry of a Redis conversation log)"""
+    return encode_messages([message], compress=compress)
+
+
+def decode_message(data: bytes) -> Any:
+    """Inverse of encode_message"""
+    return decode_messages(data)[0]
@@ -2,129 +2,624 @@
 Session Storage Module - Production-Ready with Redis Support
 Handles persistent conversation storage with TTL and fallback to in-memory
 """
+import asyncio
 import json
 import logging
-from typing import Dict, List, Optional, Any
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import timedelta
 from abc import ABC, abstractmethod
 
+from message_codec import decode_message, encode_message
+
+try:
+    from langchain_core.messages import BaseMessage, messages_from_dict, messages_to_dict
+except ImportError:
+    BaseMessage = None
+
 logger = logging.getLogger(__name__)
 
 
+def dump_conversation(conversation: List[Any]) -> str:
+    """Serialize a conversation; LangChain messages keep their type so they load back as messages"""
+    if BaseMessage is not None and conversation and all(isinstance(m, BaseMessage) for m in conversation):
+        return json.dumps({"messages": messages_to_dict(conversation)})
+    return json.dumps(conversation, default=str)
+
+
+def load_conversation(data: str) -> List[Any]:
+    """Inverse of dump_conversation"""
+    decoded = json.loads(data)
+    if isinstance(decoded, dict) and "messages" in decoded:
+        return messages_from_dict(decoded["messages"])
+    return decoded
+
+
+def load_message(data: bytes) -> Any:
+    """Decode one Redis conversation log entry (message_codec, or JSON from earlier releases)"""
+    if data[:1] in (b"{", b"["):
+        return load_conversation(data)[0]
+    return decode_message(data)
+
+
 class SessionStore(ABC):
-    """Abstract base class for session storage"""
+    """Abstract base class for session storage (async: never blocks the API event loop)"""
 
     @abstractmethod
-    def get_conversation(self, session_id: str) -> List[Any]:
-        """Get conversation history for a session"""
+    async def get_conversation(self, session_id: str, last_k: Optional[int] = None) -> List[Any]:
+        """Get conversation history for a session (only the last last_k messages if given)"""
         pass
 
     @abstractmethod
-    def save_conversation(self, session_id: str, conversation: List[Any]) -> None:
-        """Save conversation history for a session"""
+    async def save_conversation(self, session_id: str, conversation: List[Any]) -> None:
+        """Save (replace) conversation history for a session"""
         pass
 
+    async def append_messages(self, session_id: str, messages: List[Any]) -> None:
+        """Append new messages to a session's history"""
+        conversation = await self.get_conversation(session_id)
+        await self.save_conversation(session_id, conversation + list(messages))
+
     @abstractmethod
-    def delete_session(self, session_id: str) -> None:
-        """Delete a session"""
+    async def delete_session(self, session_id: str) -> bool:
+        """Delete a session; returns False if it did not exist"""
         pass
 
     @abstractmethod
-    def get_all_sessions(self) -> List[str]:
+    async def get_all_sessions(self) -> List[str]:
         """Get all active session IDs"""
         pass
 
+    async def list_sessions(self, cursor: Optional[str] = None, limit: int = 50) -> Tuple[List[str], Optional[str]]:
+        """
+        Page through session IDs
+
+        Returns:
+            (session_ids, next_cursor) - next_cursor is None on the last page
+        """
+        session_ids = await self.get_all_sessions()
+        offset = int(cursor) if cursor else 0
+        page = session_ids[offset:offset + limit]
+        next_offset = offset + len(page)
+        return page, str(next_offset) if next_offset < len(session_ids) else None
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for tuning (empty if the store keeps none)"""
+        return {}
+
+    async def close(self) -> None:
+        """Release connections"""
+        pass
+
 
 class RedisSessionStore(SessionStore):
-    """Redis-based session store with TTL"""
+    """
+    Redis-based session store with TTL (redis.asyncio over a shared connection pool)
+
+    Each conversation is a Redis list with one entry per message, so a turn
+    appends only its new messages instead of rewriting the whole history.
+    A sorted set (session_id -> last save time) indexes the sessions, so listing
+    never walks the keyspace. Index entries older than the TTL belong to expired
+    conversations and are trimmed on save; reindex() adds pre-index sessions via SCAN,
+    once per Redis database (REINDEX_MARKER_KEY records that it finished).
+    """
 
-    def __init__(self, redis_host='localhost', redis_port=6379, redis_db=0, ttl_hours=24):
+    INDEX_KEY = "sessions:by_activity"
+    REINDEX_MARKER_KEY = "sessions:by_activity:reindexed"
+    INDEX_VERSION = b"1"  # Bump to make every store reindex once more
+
+    def __init__(self, redis_host='localhost', redis_port=6379, redis_db=0, ttl_hours=24, max_connections=50):
+        import redis.asyncio as redis
+
+        self.pool = redis.ConnectionPool(
+            host=redis_host,
+            port=redis_port,
+            db=redis_db,
+            decode_responses=False,  # Conversation entries are binary (message_codec)
+            socket_timeout=5,
+            socket_connect_timeout=5,
+            max_connections=max_connections,
+            health_check_interval=30,
+        )
+        self.redis_client = redis.Redis(connection_pool=self.pool)
+        self.ttl = timedelta(hours=ttl_hours)
+        self._reindex_task: Optional[asyncio.Task] = None
+
+    async def connect(self) -> None:
+        """
+        Verify the connection (raises if Redis is unreachable) and, unless a previous
+        start already finished it, index legacy sessions in the background
+        """
         try:
-            import redis
-            self.redis_client = redis.Redis(
-                host=redis_host,
-                port=redis_port,
-                db=redis_db,
-                decode_responses=True,
-                socket_timeout=5,
-                socket_connect_timeout=5
-            )
-            # Test connection
-            self.redis_client.ping()
-            self.ttl = timedelta(hours=ttl_hours)
-            logger.info(f"✅ Redis session store initialized (TTL: {ttl_hours}h)")
+            await self.redis_client.ping()
+            reindexed = await self.redis_client.get(self.REINDEX_MARKER_KEY) == self.INDEX_VERSION
+            logger.info(f"✅ Redis session store initialized (TTL: {self.ttl})")
         except Exception as e:
             logger.error(f"❌ Failed to connect to Redis: {e}")
             raise
+        if not reindexed:
+            self._reindex_task = asyncio.create_task(self.reindex())
+
+    def _oldest_live_score(self) -> float:
+        """Index scores below this belong to conversations whose key has expired"""
+        return time.time() - self.ttl.total_seconds()
+
+    def _touch(self, pipe, session_id: str) -> None:
+        """Queue the TTL refresh and index update that go with every write"""
+        pipe.expire(f"conv:{session_id}", self.ttl)
+        pipe.zadd(self.INDEX_KEY, {session_id: time.time()})
+        # Keep the index consistent with key expiry
+        pipe.zremrangebyscore(self.INDEX_KEY, "-inf", f"({self._oldest_live_score()}")
+
+    async def get_conversation(self, session_id: str, last_k: Optional[int] = None) -> List[Any]:
+        from redis.exceptions import ResponseError
 
-    def get_conversation(self, session_id: str) -> List[Any]:
         try:
-            data = self.redis_client.get(f"conv:{session_id}")
-            if data:
-                return json.loads(data)
-            return []
+            try:
+                items = await self.redis_client.lrange(f"conv:{session_id}", -last_k if last_k else 0, -1)
+            except ResponseError:
+                # WRONGTYPE: saved as a single JSON string before conversations became lists
+                conversation = await self._migrate_legacy(session_id)
+                return conversation[-last_k:] if last_k else conversation
+            return [load_message(item) for item in items]
         except Exception as e:
             logger.error(f"Error getting conversation {session_id}: {e}")
             return []
 
-    def save_conversation(self, session_id: str, conversation: List[Any]) -> None:
+    async def save_conversation(self, session_id: str, conversation: List[Any]) -> None:
         try:
-            # Serialize conversation (handles LangChain message objects)
-            serialized = json.dumps(conversation, default=str)
-            self.redis_client.setex(
-                f"conv:{session_id}",
-                self.ttl,
-                serialized
-            )
+            items = [encode_message(message) for message in conversation]
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.delete(f"conv:{session_id}")
+                if items:
+                    pipe.rpush(f"conv:{session_id}", *items)
+                    self._touch(pipe, session_id)
+                else:
+                    pipe.zrem(self.INDEX_KEY, session_id)
+                results = await pipe.execute()
+            if items:
+                await self._written(session_id, results, replaced=conversation)
             logger.debug(f"Saved conversation {session_id} to Redis")
         except Exception as e:
             logger.error(f"Error saving conversation {session_id}: {e}")
 
-    def delete_session(self, session_id: str) -> None:
+    async def append_messages(self, session_id: str, messages: List[Any]) -> None:
+        """Append only the new messages (RPUSH) and refresh the TTL in the same transaction"""
+        from redis.exceptions import ResponseError
+
+        if not messages:
+            return
+        try:
+            items = [encode_message(message) for message in messages]
+            try:
+                results = await self._append(session_id, items)
+            except ResponseError:
+                await self._migrate_legacy(session_id)
+                results = await self._append(session_id, items)
+            await self._written(session_id, results, appended=messages)
+            logger.debug(f"Appended {len(items)} messages to conversation {session_id}")
+        except Exception as e:
+            logger.error(f"Error appending to conversation {session_id}: {e}")
+
+    async def _append(self, session_id: str, items: List[bytes]) -> List[Any]:
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.rpush(f"conv:{session_id}", *items)
+            self._touch(pipe, session_id)
+            return await pipe.execute()
+
+    async def _written(self, session_id: str, results: List[Any], replaced: Optional[List[Any]] = None,
+                       appended: Optional[List[Any]] = None) -> None:
+        """Called after a successful write with the transaction results (hook for caching subclasses)"""
+        pass
+
+    async def _migrate_legacy(self, session_id: str) -> List[Any]:
+        """Rewrite a whole-history JSON string as a message list, keeping its expiry"""
+        key = f"conv:{session_id}"
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            pipe.ttl(key)
+            data, ttl = await pipe.execute()
+        conversation = load_conversation(data) if data else []
+
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            if conversation:
+                pipe.rpush(key, *[encode_message(message) for message in conversation])
+                if ttl > 0:
+                    pipe.expire(key, ttl)
+            await pipe.execute()
+        logger.info(f"Migrated conversation {session_id} to a message list")
+        return conversation
+
+    async def delete_session(self, session_id: str) -> bool:
         try:
-            self.redis_client.delete(f"conv:{session_id}")
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.delete(f"conv:{session_id}")
+                pipe.zrem(self.INDEX_KEY, session_id)
+                deleted, _ = await pipe.execute()
             logger.info(f"Deleted session {session_id}")
+            return deleted > 0
         except Exception as e:
             logger.error(f"Error deleting session {session_id}: {e}")
+            return False
 
-    def get_all_sessions(self) -> List[str]:
+    async def get_all_sessions(self) -> List[str]:
         try:
-            keys = self.redis_client.keys("conv:*")
-            return [key.replace("conv:", "") for key in keys]
+            members = await self.redis_client.zrevrangebyscore(self.INDEX_KEY, "+inf", self._oldest_live_score())
+            if members:
+                return [member.decode() for member in members]
+            # Empty index: sessions may predate it
+            return [session_id async for session_id in self._scan_session_ids()]
         except Exception as e:
             logger.error(f"Error getting all sessions: {e}")
             return []
 
+    async def list_sessions(self, cursor: Optional[str] = None, limit: int = 50) -> Tuple[List[str], Optional[str]]:
+        """
+        Page through sessions, most recently active first
+
+        The cursor is "<score>:<session_id>" of the last row returned, so pages
+        stay stable while other sessions are saved.
+        """
+        max_score: Any = "+inf"
+        skip = 0
+        if cursor:
+            score_text, _, last_id = cursor.partition(":")
+            max_score = float(score_text)
+            # Ties on the cursor score come back in reverse member order; skip those already returned
+            tied = await self.redis_client.zrangebyscore(self.INDEX_KEY, max_score, max_score)
+            skip = sum(1 for member in tied if member.decode() >= last_id)
+
+        rows = await self.redis_client.zrevrangebyscore(
+            self.INDEX_KEY, max_score, self._oldest_live_score(), start=skip, num=limit, withscores=True
+        )
+        session_ids = [member.decode() for member, _ in rows]
+        next_cursor = f"{rows[-1][1]!r}:{session_ids[-1]}" if len(rows) == limit else None
+        return session_ids, next_cursor
+
+    async def _scan_session_ids(self):
+        async for key in self.redis_client.scan_iter(match="conv:*", count=500):
+            yield key[len(b"conv:"):].decode()
+
+    async def reindex(self, batch_size: int = 500) -> int:
+        """
+        Add sessions saved before the index existed (incremental SCAN, never KEYS)
+
+        Last activity is recovered from the remaining TTL, so the entries expire
+        from the index together with their keys. A complete pass sets REINDEX_MARKER_KEY,
+        so later connect() calls (restarts, other replicas) skip the SCAN.
+
+        Returns:
+            Number of sessions indexed
+        """
+        indexed = 0
+        batch: List[str] = []
+        try:
+            async for session_id in self._scan_session_ids():
+                batch.append(session_id)
+                if len(batch) >= batch_size:
+                    indexed += await self._index_batch(batch)
+                    batch = []
+            if batch:
+                indexed += await self._index_batch(batch)
+            await self.redis_client.set(self.REINDEX_MARKER_KEY, self.INDEX_VERSION)
+        except Exception as e:
+            logger.error(f"Error indexing legacy sessions: {e}")
+        if indexed:
+            logger.info(f"Indexed {indexed} legacy sessions")
+        return indexed
+
+    async def _index_batch(self, session_ids: List[str]) -> int:
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for session_id in session_ids:
+                pipe.ttl(f"conv:{session_id}")
+            ttls = await pipe.execute()
+
+        now = time.time()
+        ttl_seconds = self.ttl.total_seconds()
+        scores = {
+            session_id: now - (ttl_seconds - remaining)
+            for session_id, remaining in zip(session_ids, ttls)
+            if remaining > 0
+        }
+        if scores:
+            # NX: never move back a session that was saved (and indexed) meanwhile
+            await self.redis_client.zadd(self.INDEX_KEY, scores, nx=True)
+        return len(scores)
+
+    async def close(self) -> None:
+        if self._reindex_task and not self._reindex_task.done():
+            self._reindex_task.cancel()
+        await self.redis_client.aclose()
+        await self.pool.disconnect()
+
+
+class CachedRedisSessionStore(RedisSessionStore):
+    """
+    RedisSessionStore with an in-process LRU of decoded conversations in front of it
+
+    Every write bumps a per-session version (convver:<id>) in the same transaction and
+    publishes "<version> <writer> <session_id>" on INVALIDATION_CHANNEL; other replicas
+    drop older local copies. Local reads are only served while the invalidation
+    subscription is live, so a lost connection degrades to plain Redis reads.
+    """
+
+    INVALIDATION_CHANNEL = "sessions:invalidate"
+
+    def __init__(self, *args, local_max_sessions=256, **kwargs):
+        super().__init__(*args, **kwargs)
+        # session_id -> [version, conversation], least recently used first
+        self.local: "OrderedDict[str, List[Any]]" = OrderedDict()
+        self.local_max_sessions = local_max_sessions
+        self.instance_id = uuid.uuid4().hex
+        self.subscribed = False
+        self._listener: Optional[asyncio.Task] = None
+        # session_id -> highest version invalidated while a read of it was in flight
+        self._inflight: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def connect(self) -> None:
+        await super().connect()
+        self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        """Apply invalidations from other replicas; resubscribe (with an empty local tier) after errors"""
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(self.INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "subscribe":
+                        self.subscribed = True
+                    elif message["type"] == "message":
+                        self._invalidate(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️  Session invalidation subscription lost, retrying: {e}")
+            finally:
+                # Invalidations may be missed from here on: stop trusting local copies
+                self.subscribed = False
+                self.local.clear()
+                await pubsub.aclose()
+            await asyncio.sleep(1)
+
+    def _invalidate(self, data: bytes) -> None:
+        version_text, origin, session_id = data.decode().split(" ", 2)
+        if origin == self.instance_id:
+            return
+        version = int(version_text)
+        if session_id in self._inflight:
+            self._inflight[session_id] = max(self._inflight[session_id], version)
+        entry = self.local.get(session_id)
+        if entry is not None and entry[0] < version:
+            del self.local[session_id]
+            self.invalidations += 1
+
+    def _cache(self, session_id: str, version: int, conversation: List[Any]) -> None:
+        self.local[session_id] = [version, conversation]
+        self.local.move_to_end(session_id)
+        while len(self.local) > self.local_max_sessions:
+            self.local.popitem(last=False)
+
+    def _touch(self, pipe, session_id: str) -> None:
+        super()._touch(pipe, session_id)
+        # Last two results of every write transaction: new version, expire
+        pipe.incr(f"convver:{session_id}")
+        pipe.expire(f"convver:{session_id}", self.ttl)
+
+    async def _publish(self, session_id: str, version: int) -> None:
+        await self.redis_client.publish(self.INVALIDATION_CHANNEL, f"{version} {self.instance_id} {session_id}")
+
+    async def get_conversation(self, session_id: str, last_k: Optional[int] = None) -> List[Any]:
+        from redis.exceptions import ResponseError
+
+        entry = self.local.get(session_id) if self.subscribed else None
+        if entry is not None:
+            self.local.move_to_end(session_id)
+            self.hits += 1
+            return entry[1][-last_k:] if last_k else list(entry[1])
+
+        self.misses += 1
+        if not self.subscribed or last_k:
+            return await super().get_conversation(session_id, last_k)
+
+        self._inflight.setdefault(session_id, 0)
+        try:
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.get(f"convver:{session_id}")
+                pipe.lrange(f"conv:{session_id}", 0, -1)
+                version, items = await pipe.execute()
+        except ResponseError:
+            # Legacy string key: the base class migrates it
+            return await super().get_conversation(session_id)
+        except Exception as e:
+            logger.error(f"Error getting conversation {session_id}: {e}")
+            return []
+        finally:
+            invalidated = self._inflight.pop(session_id, 0)
+
+        conversation = [load_message(item) for item in items]
+        version = int(version or 0)
+        if conversation and self.subscribed and version >= invalidated:
+            self._cache(session_id, version, conversation)
+        return list(conversation)
+
+    async def save_conversation(self, session_id: str, conversation: List[Any]) -> None:
+        if not conversation:
+            await self.delete_session(session_id)
+            return
+        await super().save_conversation(session_id, conversation)
+
+    async def _written(self, session_id: str, results: List[Any], replaced: Optional[List[Any]] = None,
+                       appended: Optional[List[Any]] = None) -> None:
+        version = results[-2]
+        entry = self.local.get(session_id)
+        if replaced is not None:
+            self._cache(session_id, version, list(replaced))
+        elif entry is not None and entry[0] == version - 1:
+            entry[0] = version
+            entry[1].extend(appended)
+            self.local.move_to_end(session_id)
+        else:
+            # Someone else wrote in between: reload on the next read
+            self.local.pop(session_id, None)
+        await self._publish(session_id, version)
+
+    async def delete_session(self, session_id: str) -> bool:
+        self.local.pop(session_id, None)
+        deleted = await super().delete_session(session_id)
+        try:
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.incr(f"convver:{session_id}")
+                pipe.expire(f"convver:{session_id}", self.ttl)
+                version, _ = await pipe.execute()
+            await self._publish(session_id, version)
+        except Exception as e:
+            logger.error(f"Error publishing deletion of {session_id}: {e}")
+        return deleted
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "local_sessions": len(self.local),
+            "local_max_sessions": self.local_max_sessions,
+            "subscribed": self.subscribed,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+    async def close(self) -> None:
+        if self._listener and not self._listener.done():
+            self._listener.cancel()
+        await super().close()
+
 
 class InMemorySessionStore(SessionStore):
-    """In-memory session store (fallback, not production-safe)"""
+    """
+    In-memory session store (fallback, not production-safe)
+
+    LRU over sessions, refreshed on read and write, bounded by a session count and
+    an approximate byte budget (serialized size); idle sessions expire after idle_ttl_seconds.
+    """
 
-    def __init__(self, max_sessions=1000):
-        self.store: Dict[str, List[Any]] = {}
+    def __init__(self, max_sessions=1000, max_bytes=256 * 1024 * 1024, idle_ttl_seconds=24 * 3600):
+        # session_id -> [conversation, approx_bytes, last_access], least recently used first
+        self.store: "OrderedDict[str, List[Any]]" = OrderedDict()
         self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
         logger.warning("⚠️  Using in-memory session store - sessions will be lost on restart")
 
-    def get_conversation(self, session_id: str) -> List[Any]:
-        return self.store.get(session_id, [])
+    def _drop(self, session_id: str) -> None:
+        _, size, _ = self.store.pop(session_id)
+        self.total_bytes -= size
 
-    def save_conversation(self, session_id: str, conversation: List[Any]) -> None:
-        # Implement basic LRU by removing oldest session if at capacity
-        if len(self.store) >= self.max_sessions and session_id not in self.store:
-            oldest = next(iter(self.store))
-            del self.store[oldest]
-            logger.warning(f"Max sessions reached, removed oldest: {oldest}")
+    def _expire_idle(self, now: float) -> None:
+        # LRU order is last-access order, so idle sessions sit at the front
+        deadline = now - self.idle_ttl_seconds
+        while self.store:
+            session_id, (_, _, last_access) = next(iter(self.store.items()))
+            if last_access > deadline:
+                break
+            self._drop(session_id)
+            self.expirations += 1
 
-        self.store[session_id] = conversation
+    async def get_conversation(self, session_id: str, last_k: Optional[int] = None) -> List[Any]:
+        now = time.monotonic()
+        entry = self.store.get(session_id)
+        if entry is None or entry[2] <= now - self.idle_ttl_seconds:
+            if entry is not None:
+                self._drop(session_id)
+                self.expirations += 1
+            self.misses += 1
+            return []
+        entry[2] = now
+        self.store.move_to_end(session_id)
+        self.hits += 1
+        # A copy: callers (the agent) append to the list they get
+        return entry[0][-last_k:] if last_k else list(entry[0])
 
-    def delete_session(self, session_id: str) -> None:
+    async def save_conversation(self, session_id: str, conversation: List[Any]) -> None:
+        now = time.monotonic()
+        self._expire_idle(now)
         if session_id in self.store:
-            del self.store[session_id]
+            self._drop(session_id)
+
+        size = len(dump_conversation(conversation))
+        self.store[session_id] = [list(conversation), size, now]
+        self.total_bytes += size
+        self._evict()
+
+    async def append_messages(self, session_id: str, messages: List[Any]) -> None:
+        entry = self.store.get(session_id)
+        if entry is None or entry[2] <= time.monotonic() - self.idle_ttl_seconds:
+            await self.save_conversation(session_id, list(messages))
+            return
+        size = len(dump_conversation(list(messages)))
+        entry[0].extend(messages)
+        entry[1] += size
+        entry[2] = time.monotonic()
+        self.total_bytes += size
+        self.store.move_to_end(session_id)
+        self._evict()
+
+    def _evict(self) -> None:
+        # Evict least recently used sessions; the one just saved always stays
+        while len(self.store) > 1 and (len(self.store) > self.max_sessions or self.total_bytes > self.max_bytes):
+            oldest = next(iter(self.store))
+            self._drop(oldest)
+            self.evictions += 1
+            logger.warning(f"Session store full, evicted least recently used: {oldest}")
 
-    def get_all_sessions(self) -> List[str]:
+    async def delete_session(self, session_id: str) -> bool:
+        if session_id in self.store:
+            self._drop(session_id)
+            return True
+        return False
+
+    async def get_all_sessions(self) -> List[str]:
+        self._expire_idle(time.monotonic())
         return list(self.store.keys())
 
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self.store),
+            "approx_bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+def create_in_memory_session_store() -> InMemorySessionStore:
+    """In-memory store sized from SESSION_MEMORY_MAX_SESSIONS / SESSION_MEMORY_MAX_BYTES / SESSION_IDLE_TTL_SECONDS"""
+    return InMemorySessionStore(
+        max_sessions=int(os.getenv("SESSION_MEMORY_MAX_SESSIONS", "1000")),
+        max_bytes=int(os.getenv("SESSION_MEMORY_MAX_BYTES", str(256 * 1024 * 1024))),
+        idle_ttl_seconds=float(os.getenv("SESSION_IDLE_TTL_SECONDS", str(24 * 3600))),
+    )
+
 
-def create_session_store(use_redis=True, redis_host='localhost', redis_port=6379) -> SessionStore:
+async def create_session_store(
+    use_redis=True,
+    redis_host='localhost',
+    redis_port=6379,
+    max_connections=50,
+    local_cache_sessions=0,
+) -> SessionStore:
     """
     Factory function to create appropriate session store
 
@@ -132,15 +627,27 @@ def create_session_store(use_redis=True, redis_host='localhost', redis_port=6379
         use_redis: Whether to use Redis (recommended for production)
         redis_host: Redis host
         redis_port: Redis port
+        max_connections: Size of the Redis connection pool
+        local_cache_sessions: Conversations kept decoded in process in front of Redis (0 disables)
 
     Returns:
         SessionStore instance
     """
     if use_redis:
         try:
-            return RedisSessionStore(redis_host=redis_host, redis_port=redis_port)
+            if local_cache_sessions > 0:
+                store = CachedRedisSessionStore(
+                    redis_host=redis_host,
+                    redis_port=redis_port,
+                    max_connections=max_connections,
+                    local_max_sessions=local_cache_sessions,
+                )
+            else:
+                store = RedisSessionStore(redis_host=redis_host, redis_port=redis_port, max_connections=max_connections)
+            await store.connect()
+            return store
         except Exception as e:
             logger.error(f"Failed to create Redis store, falling back to in-memory: {e}")
-            return InMemorySessionStore()
+            return create_in_memory_session_store()
     else:
-        return InMemorySessionStore()
+        return create_in_memory_session_store()
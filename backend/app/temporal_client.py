@@ -0,0 +1,86 @@
+"""
+Shared Temporal client for the API process
+One gRPC connection per process, opened in the FastAPI lifespan, reconnected
+on demand, with a background health probe whose cached result /health reports.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from temporalio.client import Client
+from temporalio.service import KeepAliveConfig, RetryConfig
+
+logger = logging.getLogger(__name__)
+
+
+class TemporalClientManager:
+    """Owns the process-wide Temporal client and its health probe"""
+
+    def __init__(self, host: Optional[str] = None, namespace: str = "default", probe_interval_seconds: float = 15.0):
+        self.host = host or os.getenv("TEMPORAL_HOST", "localhost:7233")
+        self.namespace = namespace
+        self.probe_interval_seconds = probe_interval_seconds
+        self._client: Optional[Client] = None
+        self._connect_lock = asyncio.Lock()
+        self._probe_task: Optional[asyncio.Task] = None
+        self.health: Dict[str, Any] = {"status": "unknown", "checked_at": None, "error": None}
+
+    async def start(self) -> None:
+        """Connect (best effort - the API still starts if Temporal is down) and start probing"""
+        try:
+            await self.get_client()
+        except Exception as e:
+            logger.warning(f"⚠️  Temporal not reachable at {self.host} on startup: {e}")
+        self._probe_task = asyncio.create_task(self._probe_loop())
+
+    async def stop(self) -> None:
+        """Stop the health probe"""
+        if self._probe_task:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+
+    async def get_client(self) -> Client:
+        """Return the shared client, connecting (or reconnecting) if needed"""
+        if self._client is not None:
+            return self._client
+        async with self._connect_lock:
+            if self._client is None:
+                self._client = await Client.connect(
+                    self.host,
+                    namespace=self.namespace,
+                    keep_alive_config=KeepAliveConfig(interval_millis=30_000, timeout_millis=15_000),
+                    retry_config=RetryConfig(max_retries=5, max_elapsed_time_millis=10_000),
+                )
+                logger.info(f"✅ Connected to Temporal at {self.host}")
+        return self._client
+
+    def reset(self) -> None:
+        """Drop the client so the next get_client() reconnects"""
+        self._client = None
+
+    async def probe(self) -> Dict[str, Any]:
+        """Check server health once and cache the result"""
+        try:
+            client = await self.get_client()
+            serving = await client.service_client.check_health(timeout=timedelta(seconds=5))
+            self.health = {"status": "connected" if serving else "not_serving", "checked_at": _now(), "error": None}
+        except Exception as e:
+            # The channel may be wedged after a server restart; reconnect on next use
+            self.reset()
+            self.health = {"status": "disconnected", "checked_at": _now(), "error": str(e)}
+        return self.health
+
+    async def _probe_loop(self) -> None:
+        while True:
+            await self.probe()
+            await asyncio.sleep(self.probe_interval_seconds)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
@@ -0,0 +1,155 @@
+"""
+Live workflow progress events for the API
+One get_events query poller per workflow, fanned out to every subscriber, so
+any number of open builder tabs cost the same as one.
+"""
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional
+
+from temporalio.client import Client
+
+from dynamic_workflow import TERMINAL_EVENTS, VisualWorkflowExecutor
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBER_QUEUE_SIZE = 1000
+RECENT_EVENTS = 256  # Replayed to subscribers that join a stream already being polled
+STREAM_MARKERS = ("events_dropped", "stream_error")  # Hub-generated, delivered to every subscriber
+
+
+class WorkflowEventHub:
+    """Polls each watched workflow once and publishes its events to subscriber queues"""
+
+    def __init__(
+        self,
+        get_client: Callable[[], Awaitable[Client]],
+        min_poll_seconds: float = 0.25,
+        max_poll_seconds: float = 2.0,
+    ):
+        self._get_client = get_client
+        self.min_poll_seconds = min_poll_seconds
+        self.max_poll_seconds = max_poll_seconds
+        self._subscribers: Dict[str, Dict[asyncio.Queue, int]] = {}  # workflow_id -> {queue: after_seq}
+        self._recent: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._held_after: Dict[str, int] = {}  # workflow_id -> seq after which _recent holds every event
+        self._pollers: Dict[str, asyncio.Task] = {}
+
+    @asynccontextmanager
+    async def subscribe(self, workflow_id: str, after_seq: int = 0) -> AsyncIterator[asyncio.Queue]:
+        """
+        Subscribe to a workflow's events
+
+        Yields a queue of event dicts; None marks the end of the stream
+        (workflow finished, or it could not be queried).
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        last_seq, ended, dropped = after_seq, False, False
+        if workflow_id in self._pollers and after_seq < self._held_after[workflow_id]:
+            # Joining a stream already being polled from a later seq: the events
+            # before the hub's replay buffer come from a one-off query of their own
+            batch = await self._backfill(workflow_id, after_seq)
+            dropped = batch["dropped"]
+            if dropped:
+                self._put(queue, {"seq": after_seq, "type": "events_dropped"})
+            for event in batch["events"]:
+                self._put(queue, event)
+                last_seq = max(last_seq, event["seq"])
+                ended = ended or event["type"] in TERMINAL_EVENTS
+
+        # No awaits from here on, so nothing is published between the replay and attaching the queue
+        if workflow_id in self._pollers:
+            if last_seq < self._held_after[workflow_id] and not dropped:
+                self._put(queue, {"seq": last_seq, "type": "events_dropped"})
+            for event in self._recent.get(workflow_id, ()):
+                if event["seq"] > last_seq and event["type"] not in STREAM_MARKERS:
+                    self._put(queue, event)
+        elif ended:
+            self._put(queue, None)
+        else:
+            self._held_after[workflow_id] = last_seq
+            self._pollers[workflow_id] = asyncio.create_task(self._poll(workflow_id, last_seq))
+        if not ended or workflow_id in self._pollers:
+            # Registered at last_seq so events the backfill already delivered are not published twice
+            self._subscribers.setdefault(workflow_id, {})[queue] = last_seq
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(workflow_id)
+            if subscribers is not None:
+                subscribers.pop(queue, None)
+                if not subscribers:
+                    self._stop(workflow_id)
+
+    async def stop(self) -> None:
+        """Cancel every poller (API shutdown)"""
+        tasks = list(self._pollers.values())
+        for workflow_id in list(self._pollers):
+            self._stop(workflow_id)
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _stop(self, workflow_id: str) -> None:
+        task = self._pollers.pop(workflow_id, None)
+        if task and task is not asyncio.current_task():
+            task.cancel()
+        self._subscribers.pop(workflow_id, None)
+        self._recent.pop(workflow_id, None)
+        self._held_after.pop(workflow_id, None)
+
+    async def _backfill(self, workflow_id: str, after_seq: int) -> Dict[str, Any]:
+        """get_events straight from the workflow (for a subscriber behind the hub's replay buffer)"""
+        try:
+            client = await self._get_client()
+            return await client.get_workflow_handle(workflow_id).query(VisualWorkflowExecutor.get_events, after_seq)
+        except Exception as e:
+            logger.warning(f"⚠️  Could not backfill events for {workflow_id}: {e}")
+            return {"events": [], "dropped": True}
+
+    @staticmethod
+    def _put(queue: asyncio.Queue, event: Optional[Dict[str, Any]]) -> None:
+        if queue.full():
+            # Slow consumer: drop its oldest event (the seq gap is visible to the client)
+            queue.get_nowait()
+        queue.put_nowait(event)
+
+    def _publish(self, workflow_id: str, event: Optional[Dict[str, Any]]) -> None:
+        if event is not None:
+            recent = self._recent.setdefault(workflow_id, deque(maxlen=RECENT_EVENTS))
+            if len(recent) == recent.maxlen and workflow_id in self._held_after:
+                self._held_after[workflow_id] = max(self._held_after[workflow_id], recent[0]["seq"])
+            recent.append(event)
+        for queue, after_seq in self._subscribers.get(workflow_id, {}).items():
+            if event is not None and event["seq"] <= after_seq and event["type"] not in STREAM_MARKERS:
+                continue
+            self._put(queue, event)
+
+    async def _poll(self, workflow_id: str, after_seq: int) -> None:
+        interval = self.min_poll_seconds
+        try:
+            client = await self._get_client()
+            # No run ID: the handle follows the workflow across continue-as-new
+            handle = client.get_workflow_handle(workflow_id)
+            while True:
+                batch = await handle.query(VisualWorkflowExecutor.get_events, after_seq)
+                if batch["dropped"]:
+                    self._publish(workflow_id, {"seq": after_seq, "type": "events_dropped"})
+                for event in batch["events"]:
+                    self._publish(workflow_id, event)
+                    after_seq = event["seq"]
+                    if event["type"] in TERMINAL_EVENTS:
+                        return
+
+                # Poll fast while the workflow is moving, back off while it waits
+                interval = self.min_poll_seconds if batch["events"] else min(interval * 2, self.max_poll_seconds)
+                await asyncio.sleep(interval)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️  Event stream for {workflow_id} stopped: {e}")
+            self._publish(workflow_id, {"seq": after_seq, "type": "stream_error", "error": str(e)})
+        finally:
+            if self._pollers.get(workflow_id) is asyncio.current_task():
+                self._publish(workflow_id, None)
+                self._stop(workflow_id)
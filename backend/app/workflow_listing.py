@@ -0,0 +1,131 @@
+"""
+Workflow listing backed by Temporal visibility queries
+Builds the list filter query, opaque page cursors and compact result rows, so
+a page of runs costs one ListWorkflowExecutions call instead of one describe() per ID.
+"""
+import base64
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from temporalio.client import WorkflowExecution, WorkflowExecutionStatus
+from temporalio.common import SearchAttributeKey, SearchAttributePair, TypedSearchAttributes
+
+WORKFLOW_TYPE = "VisualWorkflowExecutor"
+
+# Keyword search attribute holding the facility ID. Must be registered on the namespace first:
+#   temporal operator search-attribute create --name FacilityId --type Keyword
+# Unset (default) disables facility tagging and filtering.
+FACILITY_SEARCH_ATTRIBUTE = os.getenv("FACILITY_SEARCH_ATTRIBUTE") or None
+
+# Keyword search attribute holding the definition ID (registered the same way, e.g. DefinitionId).
+# Unset (default) falls back to a WorkflowId prefix match, which also matches definitions whose
+# ID extends this one ("delay-check" -> "delay-check-v2-...") and misses caller-chosen workflow IDs.
+DEFINITION_SEARCH_ATTRIBUTE = os.getenv("DEFINITION_SEARCH_ATTRIBUTE") or None
+
+# API status filter -> visibility ExecutionStatus value
+STATUS_FILTERS = {
+    "running": "Running",
+    "completed": "Completed",
+    "failed": "Failed",
+    "canceled": "Canceled",
+    "terminated": "Terminated",
+    "continued_as_new": "ContinuedAsNew",
+    "timed_out": "TimedOut",
+}
+
+
+def _quote(value: str) -> str:
+    """Quote a string literal for a visibility query"""
+    return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def build_list_query(
+    status: Optional[str] = None,
+    definition_id: Optional[str] = None,
+    facility_id: Optional[str] = None,
+    started_after: Optional[datetime] = None,
+    started_before: Optional[datetime] = None,
+) -> str:
+    """
+    Build the visibility query for the workflow list filters
+
+    The definition filter is an exact DEFINITION_SEARCH_ATTRIBUTE match; without it,
+    a prefix match on the default "<definition_id>-<timestamp>[-<index>]" workflow IDs.
+
+    Raises:
+        ValueError: for an unknown status, or a facility filter without FACILITY_SEARCH_ATTRIBUTE
+    """
+    clauses = [f"WorkflowType = {_quote(WORKFLOW_TYPE)}"]
+    if status:
+        if status not in STATUS_FILTERS:
+            raise ValueError(f"Unknown status '{status}', expected one of {sorted(STATUS_FILTERS)}")
+        clauses.append(f"ExecutionStatus = {_quote(STATUS_FILTERS[status])}")
+    if definition_id:
+        if DEFINITION_SEARCH_ATTRIBUTE:
+            clauses.append(f"{DEFINITION_SEARCH_ATTRIBUTE} = {_quote(definition_id)}")
+        else:
+            clauses.append(f"WorkflowId STARTS_WITH {_quote(definition_id + '-')}")
+    if facility_id:
+        if not FACILITY_SEARCH_ATTRIBUTE:
+            raise ValueError("Facility filtering is disabled (set FACILITY_SEARCH_ATTRIBUTE)")
+        clauses.append(f"{FACILITY_SEARCH_ATTRIBUTE} = {_quote(facility_id)}")
+    if started_after:
+        clauses.append(f"StartTime >= {_quote(started_after.isoformat())}")
+    if started_before:
+        clauses.append(f"StartTime < {_quote(started_before.isoformat())}")
+    return " AND ".join(clauses) + " ORDER BY StartTime DESC"
+
+
+def run_search_attributes(definition_id: str, facility_id: Optional[str]) -> Optional[TypedSearchAttributes]:
+    """Search attributes to tag a new run with its definition and facility (None if neither is enabled)"""
+    pairs = []
+    if DEFINITION_SEARCH_ATTRIBUTE:
+        pairs.append(SearchAttributePair(SearchAttributeKey.for_keyword(DEFINITION_SEARCH_ATTRIBUTE), definition_id))
+    if FACILITY_SEARCH_ATTRIBUTE and facility_id:
+        pairs.append(SearchAttributePair(SearchAttributeKey.for_keyword(FACILITY_SEARCH_ATTRIBUTE), str(facility_id)))
+    return TypedSearchAttributes(pairs) if pairs else None
+
+
+def encode_cursor(next_page_token: Optional[bytes]) -> Optional[str]:
+    """Opaque, URL-safe cursor for the next page (None on the last page)"""
+    if not next_page_token:
+        return None
+    return base64.urlsafe_b64encode(next_page_token).decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[bytes]:
+    """
+    Decode a cursor from encode_cursor
+
+    Raises:
+        ValueError: if the cursor is not valid base64
+    """
+    if not cursor:
+        return None
+    try:
+        return base64.urlsafe_b64decode(cursor.encode("ascii"))
+    except (ValueError, UnicodeEncodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+
+def _status_name(status: Optional[WorkflowExecutionStatus]) -> Optional[str]:
+    return status.name.lower() if status else None
+
+
+def execution_row(execution: WorkflowExecution) -> Dict[str, Any]:
+    """Compact list row for a workflow execution"""
+    row = {
+        "workflow_id": execution.id,
+        "run_id": execution.run_id,
+        "status": _status_name(execution.status),
+        "start_time": execution.start_time.isoformat() if execution.start_time else None,
+        "close_time": execution.close_time.isoformat() if execution.close_time else None,
+        "task_queue": execution.task_queue,
+        "history_length": execution.history_length,
+    }
+    for field, attribute in (("definition_id", DEFINITION_SEARCH_ATTRIBUTE), ("facility_id", FACILITY_SEARCH_ATTRIBUTE)):
+        if attribute:
+            values = execution.search_attributes.get(attribute) or []
+            row[field] = values[0] if values else None
+    return row
@@ -0,0 +1,497 @@
+"""
+Compiled execution plan for visual workflow definitions
+Turns the node/edge lists from the builder into constant-time lookup tables once per run
+"""
+from dataclasses import dataclass, field
+from datetime import timedelta
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+from temporalio.common import RetryPolicy
+
+from bindings import CompiledParams, compile_params
+from conditions import Condition, compile_router_condition
+from inline_actions import INLINE_ACTIONS
+
+
+# Edge labels tried (in order) for each completeness outcome of an email parsing node
+COMPLETENESS_LABELS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "complete": ("complete",),
+    "partial": ("partial",),
+    "incomplete": ("incomplete/gibberish", "incomplete", "gibberish"),
+})
+
+
+@dataclass(frozen=True)
+class NodeRoutes:
+    """Precomputed outgoing routes of a single node"""
+
+    targets: Tuple[str, ...] = ()
+    by_label: Mapping[str, str] = field(default_factory=lambda: MappingProxyType({}))
+    completeness: Mapping[str, str] = field(default_factory=lambda: MappingProxyType({}))
+    fan_out: bool = False  # Several unlabeled edges from a node without declared branches - run all targets concurrently
+
+    @property
+    def default(self) -> Optional[str]:
+        """Target of the first outgoing edge (taken when no label matches)"""
+        return self.targets[0] if self.targets else None
+
+
+EMPTY_ROUTES = NodeRoutes()
+
+JOIN_MODES = ("all", "any", "first_n")
+
+# Activity options used when neither the node nor its catalog block sets them (seconds)
+DEFAULT_ACTIVITY_OPTIONS: Mapping[str, Any] = MappingProxyType({
+    "start_to_close_timeout": 120,
+    "retry": MappingProxyType({
+        "maximum_attempts": 3,
+        "initial_interval": 1,
+        "maximum_interval": 10,
+    }),
+})
+
+ACTIVITY_TIMEOUTS = ("schedule_to_close_timeout", "schedule_to_start_timeout", "start_to_close_timeout", "heartbeat_timeout")
+
+# How each node's activity is run: "remote" (task queue), "local" (local activity) or "inline" (workflow code).
+# Only a node's own "execution" (stamped from its catalog block at normalization) moves it off "remote",
+# so a deploy never changes the commands an in-flight run replays.
+EXECUTION_MODES = ("remote", "local", "inline")
+
+# Activity names of the Conditional Router block (evaluated in the workflow, never scheduled)
+ROUTER_ACTIVITIES = ("conditional_router", "route_by_condition")
+
+# Executor node that waits for a reply_received signal instead of polling the inbox
+REPLY_WAIT_ACTIVITY = "wait_for_reply"
+DEFAULT_REPLY_TIMEOUT_SECONDS = 24 * 3600
+
+UNIT_SECONDS: Mapping[str, int] = MappingProxyType({"seconds": 1, "minutes": 60, "hours": 3600, "days": 86400})
+
+# Workflow input key of per-instance param overrides ({node_id: {param: value}}), merged
+# into node params at dispatch so every instance of a definition shares one plan
+PARAM_OVERRIDES_KEY = "param_overrides"
+
+# Continue-as-new defaults - keep replay cost bounded for long escalation loops
+DEFAULT_CONTINUE_AS_NEW_STEPS = 500
+DEFAULT_MAX_HISTORY_EVENTS = 10_000
+
+
+@dataclass(frozen=True)
+class JoinSpec:
+    """How a join node waits for the branches of a fan-out"""
+
+    mode: str = "all"
+    count: int = 1
+
+    def quorum(self, branch_count: int) -> int:
+        """Number of branches that must reach the join before it fires"""
+        if self.mode == "any":
+            return 1
+        if self.mode == "first_n":
+            return max(1, min(self.count, branch_count))
+        return branch_count
+
+
+def compile_join(node: Dict[str, Any]) -> JoinSpec:
+    """Build the JoinSpec of a join node from its params"""
+    params = node.get("params") or {}
+    mode = params.get("mode", "all")
+    if mode not in JOIN_MODES:
+        raise ValueError(f"Join node {node.get('id')} has unknown mode '{mode}', expected one of {JOIN_MODES}")
+    try:
+        count = int(params.get("count", 1))
+    except (TypeError, ValueError):
+        raise ValueError(f"Join node {node.get('id')} has invalid count '{params.get('count')}'")
+    return JoinSpec(mode=mode, count=count)
+
+
+def branch_targets(routes: NodeRoutes, labels: Tuple[str, str]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Resolve the two branch targets of a two-way node
+
+    Edges labelled with labels[0]/labels[1] win; every other edge (unlabeled, or
+    labelled outside this vocabulary, e.g. the complete/partial labels guessed
+    from target names) is used in order: first for the first branch, next for the second.
+    """
+    labelled = {routes.by_label[label] for label in labels if label in routes.by_label}
+    positional = [target for target in routes.targets if target not in labelled]
+    first = routes.by_label.get(labels[0]) or (positional.pop(0) if positional else None)
+    second = routes.by_label.get(labels[1]) or (positional.pop(0) if positional else None)
+    return first, second
+
+
+@dataclass(frozen=True)
+class ConditionRoute:
+    """Compiled condition and branch targets of a Conditional Router node"""
+
+    condition: Condition
+    true_target: Optional[str]
+    false_target: Optional[str]
+
+
+def compile_router(node: Dict[str, Any], routes: NodeRoutes) -> ConditionRoute:
+    """
+    Compile a Conditional Router node
+
+    Branch targets come from the true_branch/false_branch params, then from
+    edges labelled "true"/"false", then from the order of unlabeled edges (if first, else second).
+    """
+    params = node.get("params") or {}
+    try:
+        condition = compile_router_condition(params)
+    except ValueError as e:
+        raise ValueError(f"Conditional router {node.get('id')}: {e}")
+
+    true_target, false_target = branch_targets(routes, ("true", "false"))
+    return ConditionRoute(
+        condition=condition,
+        true_target=params.get("true_branch") or true_target,
+        false_target=params.get("false_branch") or false_target,
+    )
+
+
+@dataclass(frozen=True)
+class ReplyWait:
+    """Compiled settings and branch targets of a wait_for_reply node"""
+
+    timeout_seconds: float
+    from_filter: Optional[str]
+    subject_filter: Optional[str]
+    replied_target: Optional[str]
+    timeout_target: Optional[str]
+
+    def matches(self, reply: Dict[str, Any]) -> bool:
+        """Check whether a received reply satisfies this node's filters"""
+        if self.from_filter and self.from_filter.lower() not in str(reply.get("from_email", "")).lower():
+            return False
+        if self.subject_filter and self.subject_filter.lower() not in str(reply.get("subject", "")).lower():
+            return False
+        return True
+
+
+def duration_to_seconds(duration: Any, unit: str) -> float:
+    """Convert a UI duration (number or numeric string) and unit to seconds"""
+    return max(0.0, float(duration) * UNIT_SECONDS.get(unit, 1))
+
+
+def compile_reply_wait(node: Dict[str, Any], routes: NodeRoutes) -> ReplyWait:
+    """
+    Compile a wait_for_reply node
+
+    Branch targets come from edges labelled "replied"/"timeout", then from the
+    order of unlabeled edges (first on reply, second on timeout).
+    """
+    params = node.get("params") or {}
+    if params.get("timeout") is None:
+        timeout_seconds = float(DEFAULT_REPLY_TIMEOUT_SECONDS)
+    else:
+        try:
+            timeout_seconds = duration_to_seconds(params["timeout"], params.get("unit", "hours"))
+        except (TypeError, ValueError):
+            raise ValueError(f"Reply wait {node.get('id')} has invalid timeout '{params.get('timeout')}'")
+
+    replied_target, timeout_target = branch_targets(routes, ("replied", "timeout"))
+    return ReplyWait(
+        timeout_seconds=timeout_seconds,
+        from_filter=params.get("from_filter") or None,
+        subject_filter=params.get("subject_filter") or None,
+        replied_target=replied_target,
+        timeout_target=timeout_target,
+    )
+
+
+def compile_activity_options(options: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Turn JSON activity options into workflow.execute_activity keyword arguments
+
+    Args:
+        options: {
+            "schedule_to_close_timeout" / "start_to_close_timeout" / "heartbeat_timeout": seconds,
+            "retry": {
+                "maximum_attempts": int, "initial_interval": seconds, "backoff_coefficient": float,
+                "maximum_interval": seconds, "non_retryable_error_types": [str]
+            }
+        }
+        Missing keys fall back to DEFAULT_ACTIVITY_OPTIONS.
+    """
+    options = options or {}
+    kwargs: Dict[str, Any] = {}
+
+    for name in ACTIVITY_TIMEOUTS:
+        seconds = options.get(name, DEFAULT_ACTIVITY_OPTIONS.get(name))
+        if seconds is not None:
+            kwargs[name] = timedelta(seconds=float(seconds))
+
+    retry = {**DEFAULT_ACTIVITY_OPTIONS["retry"], **(options.get("retry") or {})}
+    retry_kwargs: Dict[str, Any] = {"maximum_attempts": int(retry["maximum_attempts"])}
+    for name in ("initial_interval", "maximum_interval"):
+        if retry.get(name) is not None:
+            retry_kwargs[name] = timedelta(seconds=float(retry[name]))
+    if retry.get("backoff_coefficient") is not None:
+        retry_kwargs["backoff_coefficient"] = float(retry["backoff_coefficient"])
+    if retry.get("non_retryable_error_types"):
+        retry_kwargs["non_retryable_error_types"] = list(retry["non_retryable_error_types"])
+    kwargs["retry_policy"] = RetryPolicy(**retry_kwargs)
+
+    return kwargs
+
+
+def compile_execution_mode(node: Dict[str, Any]) -> str:
+    """Decide how a node's activity runs (see EXECUTION_MODES)"""
+    activity_name = node.get("activity")
+    mode = node.get("execution") or "remote"
+    if mode not in EXECUTION_MODES:
+        raise ValueError(f"Node {node.get('id')} has unknown execution mode '{mode}', expected one of {EXECUTION_MODES}")
+    if mode == "inline" and activity_name not in INLINE_ACTIONS:
+        # No deterministic port of this activity - the next cheapest option
+        return "local"
+    return mode
+
+
+@dataclass(frozen=True)
+class WorkflowPlan:
+    """Immutable, pre-indexed form of a workflow definition"""
+
+    start_node_id: str
+    nodes: Mapping[str, Dict[str, Any]]
+    routes: Mapping[str, NodeRoutes]
+    joins: Mapping[str, JoinSpec] = field(default_factory=lambda: MappingProxyType({}))
+    activity_options: Mapping[str, Dict[str, Any]] = field(default_factory=lambda: MappingProxyType({}))
+    execution_modes: Mapping[str, str] = field(default_factory=lambda: MappingProxyType({}))
+    routers: Mapping[str, ConditionRoute] = field(default_factory=lambda: MappingProxyType({}))
+    reply_waits: Mapping[str, ReplyWait] = field(default_factory=lambda: MappingProxyType({}))
+    bindings: Mapping[str, CompiledParams] = field(default_factory=lambda: MappingProxyType({}))
+    referenced_nodes: FrozenSet[str] = frozenset()  # Nodes whose results are read by bindings
+    continue_as_new_steps: int = DEFAULT_CONTINUE_AS_NEW_STEPS
+    max_history_events: int = DEFAULT_MAX_HISTORY_EVENTS
+
+    def get_node(self, node_id: str) -> Optional[Dict[str, Any]]:
+        """Get node by ID"""
+        return self.nodes.get(node_id)
+
+    def get_activity_options(self, node_id: str) -> Dict[str, Any]:
+        """Get the execute_activity keyword arguments for a node"""
+        options = self.activity_options.get(node_id)
+        return options if options is not None else compile_activity_options(None)
+
+    def get_execution_mode(self, node_id: str) -> str:
+        """Get how a node's activity runs: remote, local or inline"""
+        return self.execution_modes.get(node_id, "remote")
+
+    def check_param_overrides(self, overrides: Mapping[str, Mapping[str, Any]]) -> None:
+        """
+        Check per-instance param overrides against this plan
+
+        Overrides are merged into params when a node is dispatched, so only activity
+        nodes take them - routers, reply waits and joins are compiled from their params.
+
+        Raises:
+            ValueError: if an override names an unknown node or one compiled from its params
+        """
+        unknown = sorted(set(overrides) - set(self.nodes))
+        if unknown:
+            raise ValueError(f"Unknown node(s) in param overrides: {', '.join(unknown)}")
+        compiled = sorted(node_id for node_id in overrides if node_id not in self.execution_modes)
+        if compiled:
+            raise ValueError(f"Params of node(s) {', '.join(compiled)} are compiled into the plan and cannot be overridden")
+
+    def get_routes(self, node_id: str) -> NodeRoutes:
+        """Get the outgoing routes of a node"""
+        return self.routes.get(node_id, EMPTY_ROUTES)
+
+    def route(self, node_id: str, result: Any) -> Tuple[Optional[str], str]:
+        """
+        Pick the next node for a finished node based on its result
+
+        Returns:
+            (next_node_id, reason) - reason is the label that matched, "single", "default" or "end"
+        """
+        router = self.routers.get(node_id)
+        if router and isinstance(result, dict) and "condition_met" in result:
+            if result["condition_met"]:
+                return router.true_target, "true"
+            return router.false_target, "false"
+
+        reply_wait = self.reply_waits.get(node_id)
+        if reply_wait and isinstance(result, dict) and result.get("status") in ("replied", "timeout"):
+            if result["status"] == "replied":
+                return reply_wait.replied_target, "replied"
+            return reply_wait.timeout_target, "timeout"
+
+        routes = self.get_routes(node_id)
+
+        if not routes.targets:
+            return None, "end"
+
+        if len(routes.targets) == 1:
+            return routes.targets[0], "single"
+
+        if isinstance(result, dict):
+            # Completeness field (email parsing) - gibberish always routes to escalation
+            completeness = result.get("completeness")
+            if completeness:
+                is_gibberish = result.get("is_gibberish", False)
+                outcome = completeness if completeness in ("complete", "partial") and not is_gibberish else "incomplete"
+                target = routes.completeness.get(outcome)
+                if target:
+                    return target, completeness
+
+            # Status field - follow the first edge labelled with the status
+            status = result.get("status")
+            if status:
+                target = routes.by_label.get(status)
+                if target:
+                    return target, status
+
+        return routes.default, "default"
+
+
+def check_binding_sources(
+    bindings: Mapping[str, CompiledParams],
+    nodes_by_id: Mapping[str, Dict[str, Any]],
+    targets: Mapping[str, List[str]],
+) -> None:
+    """
+    Check that every {{node_id.field}} binding reads a node upstream of the node it is in
+
+    Anything else would silently resolve to None at dispatch.
+
+    Raises:
+        ValueError: for a binding to an unknown node or to one that never runs before it
+    """
+    predecessors: Dict[str, List[str]] = {}
+    for source, source_targets in targets.items():
+        for target in source_targets:
+            predecessors.setdefault(target, []).append(source)
+
+    for node_id, compiled in bindings.items():
+        unknown = sorted(compiled.references - set(nodes_by_id))
+        if unknown:
+            raise ValueError(f"Node {node_id} binds to unknown node(s): {', '.join(unknown)}")
+
+        upstream: set = set()
+        pending = list(predecessors.get(node_id, ()))
+        while pending:
+            current = pending.pop()
+            if current not in upstream:
+                upstream.add(current)
+                pending.extend(predecessors.get(current, ()))
+        not_upstream = sorted(compiled.references - upstream)
+        if not_upstream:
+            raise ValueError(f"Node {node_id} binds to node(s) that do not run before it: {', '.join(not_upstream)}")
+
+
+def compile_workflow(workflow_data: Dict[str, Any]) -> WorkflowPlan:
+    """
+    Compile a workflow definition into a WorkflowPlan
+
+    Args:
+        workflow_data: JSON workflow definition with nodes and edges
+
+    Returns:
+        WorkflowPlan with id->node and source->label->target indexes
+    """
+    nodes: List[Dict[str, Any]] = workflow_data.get("nodes", [])
+    edges: List[Dict[str, Any]] = workflow_data.get("edges", [])
+
+    if not nodes:
+        raise ValueError("Workflow has no nodes")
+
+    # Find start node (first action node or trigger)
+    start_node_id = nodes[0].get("id")
+    if not start_node_id:
+        raise ValueError("Workflow has no start node")
+
+    # First occurrence wins, matching the old linear scan
+    nodes_by_id: Dict[str, Dict[str, Any]] = {}
+    for node in nodes:
+        nodes_by_id.setdefault(node.get("id"), node)
+
+    joins = {
+        node_id: compile_join(node)
+        for node_id, node in nodes_by_id.items()
+        if node.get("type") == "join"
+    }
+
+    router_ids = {node_id for node_id, node in nodes_by_id.items() if node.get("activity") in ROUTER_ACTIVITIES}
+    reply_wait_ids = {node_id for node_id, node in nodes_by_id.items() if node.get("activity") == REPLY_WAIT_ACTIVITY}
+    executor_node_ids = router_ids | reply_wait_ids
+
+    activity_options = {
+        node_id: compile_activity_options(node.get("activity_options"))
+        for node_id, node in nodes_by_id.items()
+        if node.get("activity") and node_id not in executor_node_ids
+    }
+
+    execution_modes = {
+        node_id: compile_execution_mode(node)
+        for node_id, node in nodes_by_id.items()
+        if node.get("activity") and node_id not in executor_node_ids
+    }
+
+    bindings = {}
+    for node_id, node in nodes_by_id.items():
+        if node.get("activity") and node_id not in executor_node_ids:
+            compiled = compile_params(node.get("params"))
+            if compiled:
+                bindings[node_id] = compiled
+
+    targets: Dict[str, List[str]] = {}
+    by_label: Dict[str, Dict[str, str]] = {}
+    for edge in edges:
+        source = edge.get("source")
+        target = edge.get("target")
+        targets.setdefault(source, []).append(target)
+        label = edge.get("label")
+        if label is not None:
+            by_label.setdefault(source, {}).setdefault(label, target)
+
+    routes: Dict[str, NodeRoutes] = {}
+    for source, source_targets in targets.items():
+        labels = by_label.get(source, {})
+        completeness = {}
+        for outcome, candidates in COMPLETENESS_LABELS.items():
+            for candidate in candidates:
+                if candidate in labels:
+                    completeness[outcome] = labels[candidate]
+                    break
+        routes[source] = NodeRoutes(
+            targets=tuple(source_targets),
+            by_label=MappingProxyType(labels),
+            completeness=MappingProxyType(completeness),
+            fan_out=(
+                len(source_targets) > 1
+                and not labels
+                and source not in executor_node_ids
+                and not nodes_by_id.get(source, {}).get("branches")
+            ),
+        )
+
+    check_binding_sources(bindings, nodes_by_id, targets)
+
+    routers = {
+        node_id: compile_router(nodes_by_id[node_id], routes.get(node_id, EMPTY_ROUTES))
+        for node_id in router_ids
+    }
+
+    reply_waits = {
+        node_id: compile_reply_wait(nodes_by_id[node_id], routes.get(node_id, EMPTY_ROUTES))
+        for node_id in reply_wait_ids
+    }
+
+    config = workflow_data.get("config") or {}
+
+    return WorkflowPlan(
+        start_node_id=start_node_id,
+        nodes=MappingProxyType(nodes_by_id),
+        routes=MappingProxyType(routes),
+        joins=MappingProxyType(joins),
+        activity_options=MappingProxyType(activity_options),
+        execution_modes=MappingProxyType(execution_modes),
+        routers=MappingProxyType(routers),
+        reply_waits=MappingProxyType(reply_waits),
+        bindings=MappingProxyType(bindings),
+        referenced_nodes=frozenset().union(*(compiled.references for compiled in bindings.values())),
+        continue_as_new_steps=int(config.get("continue_as_new_after_steps", DEFAULT_CONTINUE_AS_NEW_STEPS)),
+        max_history_events=int(config.get("max_history_events", DEFAULT_MAX_HISTORY_EVENTS)),
+    )
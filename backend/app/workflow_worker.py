@@ -3,6 +3,7 @@ Visual Workflow Builder - Temporal Worker
 Registers DynamicWorkflowExecutor and all action activities
 """
 import asyncio
+import os
 import sys
 from pathlib import Path
 
@@ -15,6 +16,8 @@ from temporalio import activity
 
 # Import workflow
 from dynamic_workflow import VisualWorkflowExecutor
+from blob_store import create_blob_store
+from claim_check import DEFAULT_THRESHOLD_BYTES, claim_check_activity
 
 # Import all activities from actual files
 from src.activities.real_email_actions import (
@@ -72,8 +75,9 @@ async def main():
     print("=" * 70)
 
     # Connect to Temporal
-    client = await Client.connect("localhost:7233")
-    print("✅ Connected to Temporal server at localhost:7233")
+    temporal_host = os.getenv("TEMPORAL_HOST", "localhost:7233")
+    client = await Client.connect(temporal_host)
+    print(f"✅ Connected to Temporal server at {temporal_host}")
 
     # Task queue name
     task_queue = "fourkites-workflow-queue"
@@ -101,6 +105,18 @@ async def main():
         wait_for_duration,
     ]
 
+    # Claim-check large payloads (PDFs, full email bodies) out of workflow history
+    blob_store = create_blob_store(
+        backend=os.getenv("BLOB_STORE_BACKEND", "local"),
+        path=os.getenv("BLOB_STORE_PATH"),
+        bucket=os.getenv("BLOB_STORE_BUCKET"),
+        endpoint_url=os.getenv("BLOB_STORE_ENDPOINT"),
+    )
+    if blob_store:
+        threshold = int(os.getenv("CLAIM_CHECK_THRESHOLD_BYTES", DEFAULT_THRESHOLD_BYTES))
+        activities = [claim_check_activity(fn, blob_store, threshold) for fn in activities]
+        print(f"✅ Claim-check enabled: payload fields >= {threshold} bytes go to {type(blob_store).__name__}")
+
     print("✅ Registered activities:")
     for activity in activities:
         print(f"   - {activity.__name__}")
@@ -0,0 +1,97 @@
+"""
+Micro-benchmark: per-step routing cost of the compiled WorkflowPlan vs linear edge scans
+
+Run from backend/: python tests/bench_workflow_plan.py
+"""
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from workflow_plan import compile_workflow
+
+STEPS = 2000
+SIZES = [10, 100, 1000, 10000]
+
+
+# Linear-scan lookups the executor used before the plan existed (the baseline)
+def get_node_by_id(nodes: List[Dict], node_id: str) -> Optional[Dict]:
+    """Get node by ID"""
+    for node in nodes:
+        if node.get("id") == node_id:
+            return node
+    return None
+
+
+def get_outgoing_edges(edges: List[Dict], source_id: str, edge_label: Optional[str] = None) -> List[Dict]:
+    """Get all edges going out from a source node, optionally filtered by label"""
+    outgoing = []
+    for edge in edges:
+        if edge.get("source") == source_id:
+            if edge_label is None or edge.get("label") == edge_label:
+                outgoing.append(edge)
+    return outgoing
+
+
+def build_escalation_graph(size: int) -> dict:
+    """Chain of parse nodes, each routing complete/partial/incomplete, looping back to the start"""
+    nodes = [{"id": f"n{i}", "activity": "parse_email_response_real"} for i in range(size)]
+    edges = []
+    for i in range(size):
+        nxt = f"n{(i + 1) % size}"
+        edges.append({"source": f"n{i}", "target": nxt, "label": "incomplete/gibberish"})
+        edges.append({"source": f"n{i}", "target": "n0", "label": "complete"})
+        edges.append({"source": f"n{i}", "target": "n0", "label": "partial"})
+    return {"nodes": nodes, "edges": edges}
+
+
+def legacy_step(nodes, edges, node_id, result):
+    """Per-step work done by the executor before the plan existed"""
+    get_node_by_id(nodes, node_id)
+    outgoing = get_outgoing_edges(edges, node_id)
+    route_edges = get_outgoing_edges(edges, node_id, "incomplete/gibberish")
+    if not route_edges:
+        route_edges = get_outgoing_edges(edges, node_id, "incomplete")
+    return route_edges[0]["target"] if route_edges else outgoing[0]["target"]
+
+
+def plan_step(plan, node_id, result):
+    plan.get_node(node_id)
+    return plan.route(node_id, result)[0]
+
+
+def time_walk(step, steps: int) -> float:
+    """Average microseconds per step while walking the escalation chain"""
+    result = {"completeness": "incomplete"}
+    node_id = "n0"
+    started = time.perf_counter()
+    for _ in range(steps):
+        node_id = step(node_id, result)
+    return (time.perf_counter() - started) / steps * 1_000_000
+
+
+def main():
+    print("=" * 70)
+    print("⏱️  Workflow routing micro-benchmark (µs per step)")
+    print("=" * 70)
+    print(f"{'nodes':>8} {'compile ms':>12} {'plan µs':>10} {'linear µs':>12}")
+
+    for size in SIZES:
+        data = build_escalation_graph(size)
+
+        started = time.perf_counter()
+        plan = compile_workflow(data)
+        compile_ms = (time.perf_counter() - started) * 1000
+
+        plan_us = time_walk(lambda n, r: plan_step(plan, n, r), STEPS)
+        # Linear scans get too slow to walk the full step count on large graphs
+        linear_steps = max(20, STEPS * 10 // size)
+        linear_us = time_walk(lambda n, r: legacy_step(data["nodes"], data["edges"], n, r), linear_steps)
+
+        print(f"{size:>8} {compile_ms:>12.2f} {plan_us:>10.2f} {linear_us:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
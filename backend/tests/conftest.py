@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# Backend modules import each other as top-level modules (app/ is the working directory)
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+# api.py imports the action blocks from the repository's src package
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
@@ -0,0 +1,63 @@
+"""
+Tests for the precomputed action catalog
+"""
+import gzip
+import json
+
+from action_catalog import build_action_catalog
+
+
+def _block(name, category):
+    return {"name": name, "category": category, "icon": "x", "color": "#000", "action_count": 1}
+
+
+def test_catalog_body_groups_ui_blocks_by_category():
+    catalog = build_action_catalog(
+        {"send": _block("Send", "email"), "wait": _block("Wait", "flow")},
+        {"mock": _block("Mock", "mock"), "send": _block("Old send", "email")},
+    )
+
+    body = json.loads(catalog.body)
+    assert body["total"] == 2
+    assert [entry["id"] for entry in body["categories"]["email"]] == ["send"]
+    assert json.loads(gzip.decompress(catalog.gzip_body)) == body
+    # Execution lookup covers every block; UI blocks win on clashes
+    assert set(catalog.blocks) == {"send", "wait", "mock"}
+    assert catalog.blocks["send"]["name"] == "Send"
+
+
+def test_etag_is_stable_and_content_addressed():
+    first = build_action_catalog({"send": _block("Send", "email")})
+    again = build_action_catalog({"send": _block("Send", "email")})
+    changed = build_action_catalog({"send": _block("Send email", "email")})
+
+    assert first.etag == again.etag
+    assert first.etag != changed.etag
+    assert first.gzip_body == again.gzip_body
+
+
+def test_if_none_match():
+    catalog = build_action_catalog({"send": _block("Send", "email")})
+
+    assert catalog.matches(catalog.etag)
+    assert catalog.matches(f'"other", W/{catalog.gzip_etag}')
+    assert catalog.matches("*")
+    assert not catalog.matches('"other"')
+    assert not catalog.matches(None)
+
+
+def test_execution_hash_tracks_execution_fields_of_every_block():
+    base = build_action_catalog({"send": _block("Send", "email")}, {"mock": _block("Mock", "mock")})
+    renamed = build_action_catalog({"send": _block("Send email", "email")}, {"mock": _block("Mock", "mock")})
+    retimed = build_action_catalog(
+        {"send": {**_block("Send", "email"), "activity_options": {"start_to_close_timeout": 30}}},
+        {"mock": _block("Mock", "mock")},
+    )
+    mock_changed = build_action_catalog(
+        {"send": _block("Send", "email")},
+        {"mock": {**_block("Mock", "mock"), "activity_function": "mock_v2"}},
+    )
+
+    assert base.execution_hash == renamed.execution_hash
+    assert base.etag == mock_changed.etag
+    assert len({base.execution_hash, retimed.execution_hash, mock_changed.execution_hash}) == 3
@@ -0,0 +1,55 @@
+"""
+Tests for the bounded workflow-agent work queue
+"""
+import asyncio
+
+import pytest
+
+from agent_queue import AgentQueueFull, AgentWorkQueue
+
+
+def test_rejects_when_running_and_waiting_are_full():
+    async def scenario():
+        queue = AgentWorkQueue(max_concurrent=1, max_waiting=1)
+        release = asyncio.Event()
+
+        async def turn(session_id):
+            async with queue.slot(session_id):
+                await release.wait()
+
+        tasks = [asyncio.create_task(turn("a")), asyncio.create_task(turn("b"))]
+        await asyncio.sleep(0)
+        assert (queue.active, queue.queue_depth) == (1, 1)
+
+        with pytest.raises(AgentQueueFull) as rejected:
+            async with queue.slot("c"):
+                pass
+        assert rejected.value.queue_depth == 1
+        assert rejected.value.retry_after_seconds >= 1
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert (queue.active, queue.queue_depth) == (0, 0)
+
+    asyncio.run(scenario())
+
+
+def test_turns_of_one_session_run_one_at_a_time():
+    async def scenario():
+        queue = AgentWorkQueue(max_concurrent=4, max_waiting=4)
+        running = []
+        overlap = []
+
+        async def turn(session_id):
+            async with queue.slot(session_id):
+                overlap.append(session_id in running)
+                running.append(session_id)
+                await asyncio.sleep(0.01)
+                running.remove(session_id)
+
+        await asyncio.gather(turn("a"), turn("a"), turn("b"))
+
+        assert overlap == [False, False, False]
+        assert queue._session_locks == {}
+
+    asyncio.run(scenario())
@@ -0,0 +1,268 @@
+"""
+API endpoint tests (Temporal client faked; no server or worker needed)
+"""
+import asyncio
+import json
+import types
+
+import httpx
+import pytest
+
+import api
+import workflow_listing
+
+
+class FakeTemporalClient:
+    def __init__(self):
+        self.started = []
+        self.search_attributes = {}
+
+    async def start_workflow(self, run, workflow_data, id, task_queue, search_attributes=None, **kwargs):
+        if id.endswith("-taken"):
+            raise RuntimeError("Workflow execution already started")
+        self.started.append((id, workflow_data))
+        self.search_attributes[id] = search_attributes
+        return types.SimpleNamespace(first_execution_run_id=f"run-{id}")
+
+
+@pytest.fixture
+def temporal_client(monkeypatch):
+    client = FakeTemporalClient()
+
+    async def get_client():
+        return client
+
+    monkeypatch.setattr(api.temporal, "get_client", get_client)
+    return client
+
+
+def call(method, url, **kwargs):
+    async def send():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.request(method, url, **kwargs)
+
+    return asyncio.run(send())
+
+
+def definition(**router_params):
+    return {
+        "id": "delay-check",
+        "name": "Delay check",
+        "config": {},
+        "nodes": [
+            {"id": "trigger", "type": "trigger", "next": ["route"]},
+            {"id": "route", "activity": "conditional_router", "next": ["notify", "done"],
+             "params": {"condition_field": "status", "operator": "equals", "condition_value": "late", **router_params}},
+            {"id": "notify", "activity": "log_workflow_action", "params": {"message": "late"}},
+            {"id": "done", "activity": "log_workflow_action", "params": {"message": "on time"}},
+        ],
+    }
+
+
+def test_execute_rejects_definitions_that_do_not_compile(temporal_client):
+    response = call("POST", "/api/workflows/execute", json=definition(operator="roughly"))
+
+    assert response.status_code == 400
+    assert "Invalid workflow definition" in response.json()["detail"]
+    assert temporal_client.started == []
+
+
+def test_execute_starts_valid_definitions(temporal_client):
+    response = call("POST", "/api/workflows/execute", json=definition())
+
+    assert response.status_code == 200
+    assert response.json()["workflow_id"].startswith("delay-check-")
+    assert len(temporal_client.started) == 1
+
+
+def test_param_overrides_check_node_ids_and_param_names():
+    plan = api.compile_workflow(api.normalize_workflow(api.WorkflowDefinition(**definition())))
+
+    api.check_param_overrides(plan, {"notify": {"message": "late: SHP-1"}})
+    with pytest.raises(ValueError, match="Unknown node.*nope"):
+        api.check_param_overrides(plan, {"nope": {"message": "x"}})
+    with pytest.raises(ValueError, match="Unknown param.*colour"):
+        api.check_param_overrides(plan, {"notify": {"colour": "red"}})
+    # The router's condition is part of the compiled plan
+    with pytest.raises(ValueError, match="route.*compiled"):
+        api.check_param_overrides(plan, {"route": {"condition_value": "early"}})
+
+
+def test_execute_batch_streams_one_line_per_instance(temporal_client):
+    response = call("POST", "/api/workflows/execute-batch", json={
+        "definition": definition(),
+        "instances": [
+            {"params": {"notify": {"message": "late: SHP-1"}}, "workflow_id": "delay-check-SHP-1"},
+            {"workflow_id": "delay-check-taken"},
+            {"params": {"nope": {"message": "x"}}},
+            {},
+        ],
+        "max_concurrency": 2,
+    })
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    summary = lines.pop()
+    by_index = {line["index"]: line for line in lines}
+
+    assert sorted(by_index) == [0, 1, 2, 3]
+    assert by_index[0] == {"index": 0, "workflow_id": "delay-check-SHP-1", "run_id": "run-delay-check-SHP-1"}
+    assert "already started" in by_index[1]["error"]
+    assert "Unknown node" in by_index[2]["error"]
+    assert by_index[3]["workflow_id"] == f"{summary['batch_id']}-3"
+    assert (summary["done"], summary["started"], summary["failed"]) == (True, 2, 2)
+
+    started = dict(temporal_client.started)
+    overridden, plain = started["delay-check-SHP-1"], started[by_index[3]["workflow_id"]]
+    # Overrides travel beside the definition: same nodes, same hash, same plan in the worker
+    assert overridden["param_overrides"] == {"notify": {"message": "late: SHP-1"}}
+    assert "param_overrides" not in plain
+    assert overridden["nodes"] is plain["nodes"]
+    assert overridden[api.DEFINITION_HASH_KEY] == plain[api.DEFINITION_HASH_KEY]
+
+
+def test_execute_batch_rejects_invalid_definition(temporal_client):
+    response = call("POST", "/api/workflows/execute-batch", json={
+        "definition": definition(operator="roughly"),
+        "instances": [{}],
+    })
+
+    assert response.status_code == 400
+    assert temporal_client.started == []
+
+
+@pytest.mark.parametrize("query", ["limit=0", "limit=-5", "offset=-1", "limit=100000"])
+def test_state_paging_params_are_bounded(temporal_client, query):
+    response = call("GET", f"/api/workflows/wf-1/state?{query}")
+
+    assert response.status_code == 422
+
+
+def test_execute_rejects_bindings_to_unknown_nodes(temporal_client):
+    workflow = definition()
+    workflow["nodes"][2]["params"] = {"message": "late: {{fetch.shipment_id}}"}
+
+    response = call("POST", "/api/workflows/execute", json=workflow)
+
+    assert response.status_code == 400
+    assert "unknown node(s): fetch" in response.json()["detail"]
+    assert temporal_client.started == []
+
+
+def test_batch_instances_are_tagged_with_their_definition(temporal_client, monkeypatch):
+    monkeypatch.setattr(workflow_listing, "DEFINITION_SEARCH_ATTRIBUTE", "DefinitionId")
+
+    response = call("POST", "/api/workflows/execute-batch", json={
+        "definition": definition(),
+        "instances": [{"workflow_id": "shipment-SHP-1"}],
+    })
+
+    assert response.status_code == 200
+    pairs = temporal_client.search_attributes["shipment-SHP-1"].search_attributes
+    assert [(pair.key.name, pair.value) for pair in pairs] == [("DefinitionId", "delay-check")]
+
+
+def test_normalize_stamps_execution_mode_from_the_catalog():
+    workflow_data = api.normalize_workflow(api.WorkflowDefinition(**definition()))
+    nodes = {node["id"]: node for node in workflow_data["nodes"]}
+
+    # The mode travels with the run's input, so replays never depend on the deployed code
+    assert nodes["notify"]["execution"] == "local"
+    assert api.compile_workflow(workflow_data).get_execution_mode("notify") == "local"
+
+
+class FakeAgentGraph:
+    """Stands in for the LangGraph agent: replays a fixed astream_events sequence"""
+
+    def __init__(self, block_after=None):
+        self.block_after = block_after  # Stop (until cancelled) after this many events
+        self.released = asyncio.Event()
+
+    async def astream_events(self, state, version):
+        from langchain_core.messages import AIMessage, AIMessageChunk
+
+        reply = AIMessage(content="Added a follow-up email.")
+        events = [
+            {"event": "on_chat_model_stream", "data": {"chunk": AIMessageChunk(content="Added ")}},
+            {"event": "on_tool_start", "name": "map_actions", "data": {"input": {"text": "follow up"}}},
+            {"event": "on_tool_end", "name": "map_actions", "data": {"output": "send_email_level2_followup"}},
+            {"event": "on_chat_model_stream", "data": {"chunk": AIMessageChunk(content="a follow-up email.")}},
+            {"event": "on_chain_end", "parent_ids": [], "data": {"output": {"messages": [*state["messages"], reply]}}},
+        ]
+        for index, event in enumerate(events):
+            if index == self.block_after:
+                await self.released.wait()
+            yield event
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    from agent_queue import AgentWorkQueue
+    from session_store import InMemorySessionStore
+
+    graph = FakeAgentGraph()
+    monkeypatch.setattr(api, "workflow_agent", graph)
+    monkeypatch.setattr(api, "session_store", InMemorySessionStore())
+    monkeypatch.setattr(api, "agent_queue", AgentWorkQueue(max_concurrent=1, max_waiting=0))
+    return graph
+
+
+def parse_sse(body):
+    events = []
+    for frame in body.strip().split("\n\n"):
+        event_line, data_line = frame.split("\n")
+        assert event_line.startswith("event: ") and data_line.startswith("data: ")
+        events.append((event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+    return events
+
+
+def test_chat_stream_frames_agent_events_in_order(agent):
+    response = call("POST", "/api/workflow-agent/chat/stream", json={"session_id": "s1", "message": "add a follow-up"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_sse(response.text)
+    assert [event_type for event_type, _ in events] == ["token", "tool_start", "tool_end", "token", "done"]
+    assert events[0][1] == {"text": "Added "}
+    assert events[1][1] == {"name": "map_actions", "input": {"text": "follow up"}}
+    assert events[2][1] == {"name": "map_actions", "output": "send_email_level2_followup"}
+    assert events[-1][1]["agent_response"] == "Added a follow-up email."
+
+    history = asyncio.run(api.session_store.get_conversation("s1"))
+    assert [message.content for message in history] == ["add a follow-up", "Added a follow-up email."]
+    assert (api.agent_queue.active, api.agent_queue.waiting) == (0, 0)
+
+
+def test_chat_stream_releases_its_slot_when_the_client_disconnects(agent):
+    agent.block_after = 2  # Mid-turn: after the tool has started
+
+    async def scenario():
+        response = await api.stream_chat_with_agent(api.AgentChatRequest(session_id="s1", message="hi"))
+        received = []
+
+        async def consume():
+            async for frame in response.body_iterator:
+                received.append(frame)
+
+        consumer = asyncio.create_task(consume())
+        while len(received) < 2:
+            await asyncio.sleep(0.001)
+        assert api.agent_queue.active == 1
+
+        # Starlette cancels the response task when the client goes away
+        consumer.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await consumer
+
+        assert (api.agent_queue.active, api.agent_queue.waiting) == (0, 0)
+        assert api.agent_queue._session_locks == {}
+        # The interrupted turn is not persisted, and the next turn gets the slot
+        assert await api.session_store.get_conversation("s1") == []
+        agent.block_after = None
+        response = await api.stream_chat_with_agent(api.AgentChatRequest(session_id="s1", message="hi again"))
+        frames = [frame async for frame in response.body_iterator]
+        assert frames[-1].startswith("event: done")
+
+    asyncio.run(scenario())
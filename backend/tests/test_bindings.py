@@ -0,0 +1,59 @@
+"""
+Tests for {{node_id.field}} data-binding templates
+"""
+import pytest
+
+from bindings import BindingError, compile_params, parse_template
+
+RESULTS = {
+    "extract": {"pdf_base64": {"$blob": "sha256-abc", "size": 90000}, "filename": "bol.pdf"},
+    "parse": {"contact": {"email": "ops@acme.com"}, "missing_fields": ["eta", "tracking"]},
+}
+WORKFLOW = {"id": "escalation-20260101", "run_id": "run-1", "name": "Escalation"}
+
+
+def test_no_bindings_compiles_to_none():
+    assert compile_params({"facility": "Chicago", "cc_list": ["a@b.com"]}) is None
+    assert parse_template("plain {text}") is None
+
+
+def test_whole_value_binding_keeps_type():
+    compiled = compile_params({"pdf_base64": "{{extract.pdf_base64}}", "fields": "{{ parse.missing_fields }}"})
+
+    params = compiled.resolve(RESULTS, WORKFLOW)
+
+    assert params["pdf_base64"] == {"$blob": "sha256-abc", "size": 90000}
+    assert params["fields"] == ["eta", "tracking"]
+    assert compiled.references == {"extract", "parse"}
+
+
+def test_interpolation_and_workflow_values():
+    compiled = compile_params({
+        "recipient_email": "{{parse.contact.email}}",
+        "custom_subject": "{{workflow.name}} for {{extract.filename}} ({{workflow.id}})",
+        "missing": "[{{parse.nope}}]",
+    })
+
+    params = compiled.resolve(RESULTS, WORKFLOW)
+
+    assert params["recipient_email"] == "ops@acme.com"
+    assert params["custom_subject"] == "Escalation for bol.pdf (escalation-20260101)"
+    assert params["missing"] == "[]"
+    assert compiled.references == {"parse", "extract"}
+
+
+def test_nested_bindings_do_not_mutate_template():
+    template = {"metadata": {"emails": ["{{parse.contact.email}}", "static@acme.com"]}, "level": 2}
+    compiled = compile_params(template)
+
+    params = compiled.resolve(RESULTS, WORKFLOW)
+
+    assert params == {"metadata": {"emails": ["ops@acme.com", "static@acme.com"]}, "level": 2}
+    assert template["metadata"]["emails"][0] == "{{parse.contact.email}}"
+
+
+def test_claim_check_refs_cannot_be_interpolated_into_text():
+    compiled = compile_params({"body": "Attached: {{extract.pdf_base64}}"})
+
+    with pytest.raises(BindingError, match="extract.pdf_base64"):
+        compiled.resolve(RESULTS, WORKFLOW)
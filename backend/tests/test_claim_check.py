@@ -0,0 +1,58 @@
+"""
+Tests for blob stores and claim-check offloading
+"""
+import pytest
+
+from blob_store import LocalBlobStore, SQLiteBlobStore, content_key
+from claim_check import is_blob_ref, offload_large_values, resolve_blob_refs
+
+
+@pytest.fixture(params=["local", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "local":
+        return LocalBlobStore(str(tmp_path / "blobs"))
+    return SQLiteBlobStore(str(tmp_path / "blobs.db"))
+
+
+def test_store_round_trip(store):
+    key = content_key(b"hello")
+
+    assert not store.exists(key)
+    store.put(key, b"hello")
+    assert store.exists(key)
+    assert store.get(key) == b"hello"
+
+    store.delete(key)
+    with pytest.raises(KeyError):
+        store.get(key)
+
+
+def test_offload_replaces_only_large_fields(store):
+    result = {
+        "status": "success",
+        "pdf_base64": "A" * 5000,
+        "emails": [{"subject": "Re: BOL", "body_full": "B" * 5000}],
+    }
+
+    offloaded = offload_large_values(result, store, threshold=1024)
+
+    assert offloaded["status"] == "success"
+    assert is_blob_ref(offloaded["pdf_base64"])
+    assert offloaded["pdf_base64"]["size"] == 5000
+    assert offloaded["emails"][0]["subject"] == "Re: BOL"
+    assert is_blob_ref(offloaded["emails"][0]["body_full"])
+    assert resolve_blob_refs(offloaded, store) == result
+
+
+def test_identical_payloads_share_a_blob(store):
+    first = offload_large_values({"a": "X" * 2048}, store, threshold=1024)
+    second = offload_large_values({"b": "X" * 2048}, store, threshold=1024)
+
+    assert first["a"] == second["b"]
+
+
+def test_bytes_round_trip(store):
+    offloaded = offload_large_values({"raw": b"\x00" * 2048}, store, threshold=1024)
+
+    assert offloaded["raw"]["encoding"] == "bytes"
+    assert resolve_blob_refs(offloaded, store) == {"raw": b"\x00" * 2048}
@@ -0,0 +1,75 @@
+"""
+Tests for the Conditional Router condition engine
+"""
+import pytest
+
+from conditions import ConditionError, compile_condition, compile_router_condition
+
+RESULT = {
+    "status": "success",
+    "is_gibberish": False,
+    "confidence": 0.92,
+    "delivery": {"status": "delayed", "eta_days": 3},
+    "missing_fields": ["tracking_number"],
+    "subject": "Re: Shipment SHIP-42",
+}
+
+
+@pytest.mark.parametrize("spec, expected", [
+    ({"field": "status", "operator": "equals", "value": "success"}, True),
+    ({"field": "delivery.status", "operator": "not_equals", "value": "on_time"}, True),
+    ({"field": "delivery.eta_days", "operator": "equals", "value": "3"}, True),
+    ({"field": "delivery.eta_days", "operator": "greater_than", "value": "2"}, True),
+    ({"field": "confidence", "operator": "less_than", "value": 0.5}, False),
+    ({"field": "is_gibberish", "operator": "equals", "value": "false"}, True),
+    ({"field": "missing_fields", "operator": "contains", "value": "tracking_number"}, True),
+    ({"field": "subject", "operator": "contains", "value": "SHIP-42"}, True),
+    ({"field": "missing_fields.0", "operator": "equals", "value": "tracking_number"}, True),
+    ({"field": "no.such.field", "operator": "equals", "value": "x"}, False),
+    ({"field": "no.such.field", "operator": "greater_than", "value": 1}, False),
+])
+def test_operators(spec, expected):
+    assert compile_condition(spec)(RESULT) is expected
+
+
+def test_boolean_combinators():
+    condition = compile_condition({
+        "all": [
+            {"field": "status", "operator": "equals", "value": "success"},
+            {"any": [
+                {"field": "delivery.eta_days", "operator": "greater_than", "value": 5},
+                {"not": {"field": "is_gibberish", "operator": "equals", "value": True}},
+            ]},
+        ]
+    })
+
+    assert condition(RESULT) is True
+    assert condition({"status": "failed"}) is False
+
+
+def test_router_params_flat_form():
+    condition = compile_router_condition({
+        "condition_field": "delivery.status",
+        "operator": "equals",
+        "condition_value": "delayed",
+    })
+
+    assert condition(RESULT) is True
+    assert condition(None) is False
+
+
+def test_unknown_operator_rejected():
+    with pytest.raises(ValueError):
+        compile_condition({"field": "status", "operator": "matches", "value": "x"})
+
+
+@pytest.mark.parametrize("field", ["reply.body", "reply.body.status", "extracted.items.0"])
+def test_offloaded_fields_are_not_compared(field):
+    result = {
+        "reply": {"body": {"$blob": "sha256:ab", "size": 400000, "encoding": "json"}},
+        "extracted": {"$blob": "sha256:cd", "size": 900000, "encoding": "json"},
+    }
+    condition = compile_condition({"field": field, "operator": "contains", "value": "delayed"})
+
+    with pytest.raises(ConditionError, match="offloaded"):
+        condition(result)
@@ -0,0 +1,45 @@
+"""
+Tests for definition hashing and the compiled-plan cache
+"""
+import definition_cache
+from definition_cache import LRUCache, definition_hash, get_plan
+
+
+def _workflow(**extra):
+    return {
+        "config": {},
+        "nodes": [{"id": "t", "type": "trigger"}, {"id": "a", "activity": "log_activity"}],
+        "edges": [{"source": "t", "target": "a"}],
+        **extra,
+    }
+
+
+def test_definition_hash_is_canonical():
+    nodes = [{"id": "a", "params": {"x": 1, "y": 2}}]
+    reordered = [{"params": {"y": 2, "x": 1}, "id": "a"}]
+
+    assert definition_hash(nodes, []) == definition_hash(reordered, [])
+    assert definition_hash(nodes, []) != definition_hash(nodes, [], "catalog-v2")
+    assert definition_hash(nodes, []) != definition_hash([{"id": "a", "params": {"x": 2}}], [])
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_get_plan_reuses_plans_by_hash_and_config(monkeypatch):
+    monkeypatch.setattr(definition_cache, "plan_cache", LRUCache(maxsize=8))
+
+    first = get_plan(_workflow(definition_hash="h1"))
+    assert get_plan(_workflow(definition_hash="h1")) is first
+    assert get_plan(_workflow(definition_hash="h1", config={"max_history_events": 50})) is not first
+    # No hash: always compiled fresh
+    assert get_plan(_workflow()) is not get_plan(_workflow())
@@ -0,0 +1,62 @@
+"""
+Tests for streamed, size-capped requirement document uploads
+"""
+import asyncio
+import io
+import os
+import time
+
+import pytest
+from fastapi import UploadFile
+
+import document_upload
+from document_upload import DocumentParser, DocumentParseTimeout, UploadTooLarge, save_upload
+
+
+def _stuck_parse(file_path):
+    """Stands in for a parser hung on a malformed PDF (runs in the worker process)"""
+    time.sleep(60)
+
+
+def test_save_upload_streams_to_disk():
+    upload = UploadFile(file=io.BytesIO(b"x" * 3000), filename="req.pdf")
+
+    path = asyncio.run(save_upload(upload, ".pdf", max_bytes=4096))
+    try:
+        assert path.endswith(".pdf")
+        assert os.path.getsize(path) == 3000
+    finally:
+        os.unlink(path)
+
+
+def test_save_upload_rejects_oversized_upload(monkeypatch, tmp_path):
+    monkeypatch.setattr("tempfile.tempdir", str(tmp_path))
+    upload = UploadFile(file=io.BytesIO(b"x" * 5000), filename="req.pdf")
+
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(save_upload(upload, ".pdf", max_bytes=4096))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_parse_timeout_kills_the_stuck_worker(monkeypatch):
+    monkeypatch.setattr(document_upload, "_parse_document", _stuck_parse)
+    parser = DocumentParser(max_workers=1, timeout_seconds=1)
+
+    async def scenario():
+        parse = asyncio.create_task(parser.parse("stuck.pdf"))
+        await asyncio.sleep(0.5)
+        workers = list(parser._pool._processes.values())
+        with pytest.raises(DocumentParseTimeout):
+            await parse
+        return workers
+
+    try:
+        workers = asyncio.run(scenario())
+        assert workers
+        deadline = time.monotonic() + 5
+        while any(process.is_alive() for process in workers) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert parser._pool is None
+        assert not any(process.is_alive() for process in workers)
+    finally:
+        parser.shutdown()
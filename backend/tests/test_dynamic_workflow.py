@@ -0,0 +1,270 @@
+"""
+Executor tests with the Temporal workflow APIs stubbed (activities run as plain coroutines)
+"""
+import asyncio
+import logging
+import types
+from datetime import datetime
+
+import pytest
+from temporalio.exceptions import ActivityError
+
+import dynamic_workflow
+from dynamic_workflow import VisualWorkflowExecutor
+
+DELAYS = {"slow": 0.05, "fast": 0.0, "mid": 0.02}
+
+
+async def fake_activity(name, params, **options):
+    try:
+        await asyncio.sleep(DELAYS.get(name, 0))
+    except asyncio.CancelledError:
+        # What Temporal raises in workflow code for a cancelled activity
+        raise ActivityError(
+            "Activity cancelled",
+            scheduled_event_id=1,
+            started_event_id=2,
+            identity="worker",
+            activity_type=name,
+            activity_id="1",
+            retry_state=None,
+        )
+    return {"status": "ok", "activity": name}
+
+
+async def wait_condition(fn, timeout=None):
+    async def poll():
+        while not fn():
+            await asyncio.sleep(0.001)
+
+    await asyncio.wait_for(poll(), timeout.total_seconds() if timeout else None)
+
+
+class ContinuedAsNew(BaseException):
+    """Stands in for temporalio's ContinueAsNewError (also a BaseException)"""
+
+    def __init__(self, workflow_input):
+        super().__init__("continue as new")
+        self.workflow_input = workflow_input
+
+
+def continue_as_new(workflow_input):
+    raise ContinuedAsNew(workflow_input)
+
+
+@pytest.fixture
+def stub_workflow(monkeypatch):
+    info = types.SimpleNamespace(
+        workflow_id="wf-1",
+        run_id="run-1",
+        get_current_history_length=lambda: 10,
+        is_continue_as_new_suggested=lambda: False,
+    )
+    monkeypatch.setattr(dynamic_workflow, "workflow", types.SimpleNamespace(
+        logger=logging.getLogger("workflow"),
+        execute_activity=fake_activity,
+        execute_local_activity=fake_activity,
+        wait_condition=wait_condition,
+        continue_as_new=continue_as_new,
+        info=lambda: info,
+        now=lambda: datetime(2026, 1, 1),
+    ))
+
+
+def fan_out_definition(mode, count=1):
+    return {
+        "nodes": [
+            {"id": "start", "activity": "start"},
+            {"id": "b_slow", "activity": "slow"},
+            {"id": "b_fast", "activity": "fast"},
+            {"id": "b_mid", "activity": "mid"},
+            {"id": "join", "type": "join", "params": {"mode": mode, "count": count}},
+            {"id": "after", "activity": "after"},
+        ],
+        "edges": [
+            {"source": "start", "target": "b_slow"},
+            {"source": "start", "target": "b_fast"},
+            {"source": "start", "target": "b_mid"},
+            {"source": "b_slow", "target": "join"},
+            {"source": "b_fast", "target": "join"},
+            {"source": "b_mid", "target": "join"},
+            {"source": "join", "target": "after"},
+        ],
+    }
+
+
+@pytest.mark.parametrize("mode,count,winners", [
+    ("any", 1, ["b_fast"]),
+    ("first_n", 2, ["b_fast", "b_mid"]),
+])
+def test_join_cancels_losing_branches_without_failing(stub_workflow, mode, count, winners):
+    executor = VisualWorkflowExecutor()
+
+    result = asyncio.run(executor.run(fan_out_definition(mode, count)))
+
+    assert result["status"] == "completed"
+    assert result["final_results"]["join"]["branches"] == winners
+    assert "b_slow" in result["final_results"]["join"]["cancelled"]
+    assert result["final_results"]["b_slow"] == {"status": "cancelled"}
+    assert result["final_results"]["after"]["status"] == "ok"
+
+
+def test_branch_failure_still_fails_the_run(stub_workflow, monkeypatch):
+    async def failing_activity(name, params, **options):
+        if name == "fast":
+            raise RuntimeError("boom")
+        return await fake_activity(name, params)
+
+    monkeypatch.setattr(dynamic_workflow.workflow, "execute_activity", failing_activity)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(VisualWorkflowExecutor().run(fan_out_definition("any")))
+
+
+def test_inline_action_errors_fail_the_node_not_the_workflow_task(stub_workflow):
+    from temporalio.exceptions import ApplicationError
+
+    definition = {
+        "nodes": [
+            {"id": "count", "activity": "increment_escalation_counter", "execution": "inline",
+             "params": {"current_count": None}},
+        ],
+        "edges": [],
+    }
+    executor = VisualWorkflowExecutor()
+
+    with pytest.raises(ApplicationError) as raised:
+        asyncio.run(executor.run(definition))
+
+    assert raised.value.type == "TypeError"
+    assert raised.value.non_retryable
+    assert executor.state.node_results["count"]["status"] == "failed"
+
+
+def test_param_overrides_are_merged_at_dispatch(stub_workflow, monkeypatch):
+    dispatched = {}
+
+    async def recording_activity(name, params, **options):
+        dispatched[name] = params
+        return {"status": "ok"}
+
+    monkeypatch.setattr(dynamic_workflow.workflow, "execute_activity", recording_activity)
+    definition = {
+        "nodes": [
+            {"id": "notify", "activity": "send", "params": {"message": "late", "to": "ops@acme.com"}},
+        ],
+        "edges": [],
+        "param_overrides": {"notify": {"message": "late: SHP-1"}},
+    }
+
+    asyncio.run(VisualWorkflowExecutor().run(definition))
+
+    assert dispatched["send"] == {"message": "late: SHP-1", "to": "ops@acme.com"}
+    assert definition["nodes"][0]["params"]["message"] == "late"
+
+
+def test_routing_on_an_offloaded_field_fails_the_router(stub_workflow, monkeypatch):
+    from temporalio.exceptions import ApplicationError
+
+    async def offloading_activity(name, params, **options):
+        return {"status": "ok", "body": {"$blob": "sha256:ab", "size": 400000, "encoding": "json"}}
+
+    monkeypatch.setattr(dynamic_workflow.workflow, "execute_activity", offloading_activity)
+    definition = {
+        "nodes": [
+            {"id": "fetch", "activity": "fetch_email"},
+            {"id": "route", "activity": "conditional_router",
+             "params": {"condition_field": "body", "operator": "contains", "condition_value": "delayed"}},
+            {"id": "late", "activity": "notify"},
+            {"id": "on_time", "activity": "notify"},
+        ],
+        "edges": [
+            {"source": "fetch", "target": "route"},
+            {"source": "route", "target": "late", "label": "true"},
+            {"source": "route", "target": "on_time", "label": "false"},
+        ],
+    }
+    executor = VisualWorkflowExecutor()
+
+    with pytest.raises(ApplicationError) as raised:
+        asyncio.run(executor.run(definition))
+
+    assert raised.value.type == "ConditionError"
+    assert raised.value.non_retryable
+    assert executor.state.node_results["route"]["status"] == "failed"
+    assert "on_time" not in executor.state.node_results
+
+
+def test_long_runs_continue_as_new_and_resume_from_the_snapshot(stub_workflow, monkeypatch):
+    steps = []
+
+    async def record_step(name, params, **options):
+        steps.append(params["step"])
+        return {"status": "ok", "step": params["step"]}
+
+    monkeypatch.setattr(dynamic_workflow.workflow, "execute_activity", record_step)
+    workflow_data = {
+        "config": {"continue_as_new_after_steps": 2},
+        "nodes": [{"id": f"s{i}", "activity": "record_step", "params": {"step": i}} for i in range(5)],
+        "edges": [{"source": f"s{i}", "target": f"s{i + 1}"} for i in range(4)],
+    }
+
+    runs = []
+    while True:
+        executor = VisualWorkflowExecutor()
+        runs.append(executor)
+        try:
+            result = asyncio.run(executor.run(workflow_data))
+            break
+        except ContinuedAsNew as continued:
+            workflow_data = continued.workflow_input
+
+    assert len(runs) == 3
+    assert steps == [0, 1, 2, 3, 4]  # Every node ran exactly once across the runs
+    assert [run.state.execution_path for run in runs] == [["s0", "s1"], ["s2", "s3"], ["s4"]]
+    assert (result["total_steps"], result["continuations"]) == (5, 2)
+    # Event sequence numbers carry across runs
+    seqs = [event["seq"] for event in runs[-1].state.events]
+    assert seqs == sorted(seqs) and seqs[-1] == runs[-1].state.event_seq
+    assert "workflow_failed" not in [event["type"] for run in runs for event in run.state.events]
+
+
+def reply_wait_definition(timeout_seconds):
+    return {
+        "nodes": [
+            {"id": "wait", "activity": "wait_for_reply",
+             "params": {"timeout": timeout_seconds, "unit": "seconds", "from_filter": "acme.com"}},
+            {"id": "on_reply", "activity": "on_reply"},
+            {"id": "on_timeout", "activity": "on_timeout"},
+        ],
+        "edges": [
+            {"source": "wait", "target": "on_reply", "label": "replied"},
+            {"source": "wait", "target": "on_timeout", "label": "timeout"},
+        ],
+    }
+
+
+def test_reply_wait_times_out(stub_workflow):
+    result = asyncio.run(VisualWorkflowExecutor().run(reply_wait_definition(0.05)))
+
+    assert result["execution_path"] == ["wait", "on_timeout"]
+    assert result["final_results"]["wait"]["status"] == "timeout"
+
+
+def test_reply_wait_takes_the_matching_reply_signal(stub_workflow):
+    executor = VisualWorkflowExecutor()
+
+    async def scenario():
+        run = asyncio.create_task(executor.run(reply_wait_definition(5)))
+        await asyncio.sleep(0.01)
+        assert executor.state.running_nodes == ["wait"]
+        executor.reply_received({"message_id": "m1", "from_email": "someone@other.com"})
+        executor.reply_received({"message_id": "m2", "from_email": "dock@acme.com"})
+        return await run
+
+    result = asyncio.run(scenario())
+
+    assert result["execution_path"] == ["wait", "on_reply"]
+    assert result["final_results"]["wait"]["reply"]["message_id"] == "m2"
+    # The non-matching reply stays pending for a later wait
+    assert [reply["message_id"] for reply in executor.state.pending_replies] == ["m1"]
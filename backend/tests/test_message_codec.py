@@ -0,0 +1,41 @@
+"""
+Tests for the stored-message codec
+"""
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from message_codec import SCHEMA_VERSION, decode_message, decode_messages, encode_message, encode_messages
+from session_store import load_message
+
+
+def test_round_trip_is_exact():
+    conversation = [
+        HumanMessage(content="Build a delay workflow"),
+        AIMessage(content="", tool_calls=[{"name": "get_action", "args": {"id": "send_email"}, "id": "call-1"}]),
+        ToolMessage(content='{"id": "send_email"}', tool_call_id="call-1"),
+        AIMessage(content="Done", additional_kwargs={"usage": {"input_tokens": 12}}),
+    ]
+
+    assert decode_messages(encode_messages(conversation)) == conversation
+    assert decode_message(encode_message(conversation[1])) == conversation[1]
+
+
+def test_large_messages_are_compressed():
+    message = HumanMessage(content="Escalate delayed shipments to the facility manager. " * 200)
+
+    compressed = encode_message(message)
+    plain = encode_message(message, compress=False)
+
+    assert compressed[0] == SCHEMA_VERSION
+    assert len(compressed) < len(plain) / 3
+    assert decode_message(compressed) == message
+
+
+def test_plain_values_and_legacy_json():
+    assert decode_message(encode_message({"role": "user", "content": "hi"})) == {"role": "user", "content": "hi"}
+    assert load_message(b'[{"role": "user"}]') == {"role": "user"}
+
+
+def test_unknown_version_is_rejected():
+    with pytest.raises(ValueError):
+        decode_messages(bytes((SCHEMA_VERSION + 1, 0)) + b"\x90")
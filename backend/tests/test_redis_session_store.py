@@ -0,0 +1,148 @@
+"""
+RedisSessionStore tests against fakeredis (skipped when fakeredis is not installed)
+"""
+import asyncio
+import time
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from session_store import RedisSessionStore
+
+
+def run_with_store(scenario, ttl_hours=24):
+    async def main():
+        store = RedisSessionStore(ttl_hours=ttl_hours)
+        store.redis_client = fakeredis.aioredis.FakeRedis()
+        try:
+            await scenario(store)
+        finally:
+            await store.close()
+
+    asyncio.run(main())
+
+
+def test_saves_and_deletes_maintain_the_activity_index():
+    async def scenario(store):
+        await store.save_conversation("a", [{"role": "user", "content": "hi"}])
+        await store.save_conversation("b", [{"role": "user", "content": "hello"}])
+
+        assert await store.get_all_sessions() == ["b", "a"]
+        assert await store.delete_session("a") is True
+        assert await store.redis_client.zscore(store.INDEX_KEY, "a") is None
+        assert await store.get_all_sessions() == ["b"]
+
+    run_with_store(scenario)
+
+
+def test_cursor_pages_are_stable_across_score_ties():
+    async def scenario(store):
+        now = time.time()
+        members = {f"s{i}": now - i for i in range(4)}
+        members.update({"tie-a": now + 1, "tie-b": now + 1, "tie-c": now + 1})
+        await store.redis_client.zadd(store.INDEX_KEY, members)
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = await store.list_sessions(cursor=cursor, limit=2)
+            seen += page
+            if cursor is None:
+                break
+
+        assert seen == ["tie-c", "tie-b", "tie-a", "s0", "s1", "s2", "s3"]
+
+    run_with_store(scenario)
+
+
+def test_entries_older_than_the_ttl_are_trimmed_and_hidden():
+    async def scenario(store):
+        stale_score = time.time() - 2 * 3600
+        await store.redis_client.zadd(store.INDEX_KEY, {"stale": stale_score})
+
+        assert (await store.list_sessions())[0] == []
+
+        await store.save_conversation("fresh", [{"role": "user"}])
+        assert await store.redis_client.zscore(store.INDEX_KEY, "stale") is None
+        assert await store.get_all_sessions() == ["fresh"]
+
+    run_with_store(scenario, ttl_hours=1)
+
+
+def test_reindex_adds_legacy_keys_scored_by_remaining_ttl():
+    async def scenario(store):
+        ttl_seconds = int(store.ttl.total_seconds())
+        await store.redis_client.setex("conv:recent", ttl_seconds - 60, "[]")
+        await store.redis_client.setex("conv:older", ttl_seconds - 3600, "[]")
+
+        # Empty index: listing falls back to SCAN
+        assert sorted(await store.get_all_sessions()) == ["older", "recent"]
+
+        assert await store.reindex(batch_size=1) == 2
+        scores = dict(await store.redis_client.zrange(store.INDEX_KEY, 0, -1, withscores=True))
+        assert scores[b"recent"] - scores[b"older"] == pytest.approx(3540, abs=5)
+        assert await store.get_all_sessions() == ["recent", "older"]
+
+    run_with_store(scenario)
+
+
+def test_connect_reindexes_only_until_a_pass_completes():
+    async def scenario(store):
+        ttl_seconds = int(store.ttl.total_seconds())
+        await store.redis_client.setex("conv:legacy", ttl_seconds, "[]")
+
+        await store.connect()
+        await store._reindex_task
+        assert await store.redis_client.get(store.REINDEX_MARKER_KEY) == store.INDEX_VERSION
+        assert await store.get_all_sessions() == ["legacy"]
+
+        # A restart (or another replica) finds the marker and does not SCAN again
+        store._reindex_task = None
+        await store.connect()
+        assert store._reindex_task is None
+
+    run_with_store(scenario)
+
+
+def test_append_pushes_only_new_messages_and_refreshes_ttl():
+    from langchain_core.messages import AIMessage, HumanMessage
+
+    async def scenario(store):
+        await store.append_messages("s", [HumanMessage(content="q1"), AIMessage(content="a1")])
+        await store.redis_client.expire("conv:s", 10)
+
+        history = await store.get_conversation("s")
+        stored = len(history)
+        history += [HumanMessage(content="q2"), AIMessage(content="a2")]
+        await store.append_messages("s", history[stored:])
+
+        assert await store.redis_client.llen("conv:s") == 4
+        assert await store.redis_client.ttl("conv:s") > 10
+        assert [m.content for m in await store.get_conversation("s")] == ["q1", "a1", "q2", "a2"]
+        assert [m.content for m in await store.get_conversation("s", last_k=3)] == ["a1", "q2", "a2"]
+
+        await store.save_conversation("s", [HumanMessage(content="reset")])
+        assert [m.content for m in await store.get_conversation("s")] == ["reset"]
+
+    run_with_store(scenario)
+
+
+def test_legacy_string_conversations_migrate_to_lists():
+    from langchain_core.messages import AIMessage, HumanMessage
+    from session_store import dump_conversation
+
+    async def scenario(store):
+        legacy = dump_conversation([HumanMessage(content="q1"), AIMessage(content="a1")])
+        await store.redis_client.setex("conv:read", 600, legacy)
+        await store.redis_client.setex("conv:appended", 600, legacy)
+
+        # WRONGTYPE on read: rewritten as a list, remaining TTL kept
+        assert [m.content for m in await store.get_conversation("read", last_k=1)] == ["a1"]
+        assert await store.redis_client.type("conv:read") == b"list"
+        assert 0 < await store.redis_client.ttl("conv:read") <= 600
+
+        # WRONGTYPE on append: migrated first, then appended
+        await store.append_messages("appended", [HumanMessage(content="q2")])
+        assert [m.content for m in await store.get_conversation("appended")] == ["q1", "a1", "q2"]
+
+    run_with_store(scenario)
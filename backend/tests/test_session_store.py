@@ -0,0 +1,124 @@
+"""
+Tests for the agent session stores and conversation serialization
+"""
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from session_store import InMemorySessionStore, dump_conversation, load_conversation
+
+
+def test_conversation_round_trip_keeps_message_types():
+    conversation = [HumanMessage(content="Build a workflow"), AIMessage(content="Sure")]
+
+    loaded = load_conversation(dump_conversation(conversation))
+
+    assert [type(message) for message in loaded] == [HumanMessage, AIMessage]
+    assert [message.content for message in loaded] == ["Build a workflow", "Sure"]
+    assert load_conversation(dump_conversation([{"role": "user"}])) == [{"role": "user"}]
+
+
+def test_in_memory_store():
+    async def scenario():
+        store = InMemorySessionStore(max_sessions=2)
+        await store.save_conversation("a", ["hi"])
+        await store.save_conversation("b", ["hello"])
+        await store.save_conversation("c", ["hey"])
+
+        assert await store.get_conversation("a") == []
+        assert sorted(await store.get_all_sessions()) == ["b", "c"]
+        assert await store.delete_session("b") is True
+        assert await store.delete_session("b") is False
+
+    asyncio.run(scenario())
+
+
+def test_in_memory_store_evicts_least_recently_used():
+    async def scenario():
+        store = InMemorySessionStore(max_sessions=2)
+        await store.save_conversation("a", ["hi"])
+        await store.save_conversation("b", ["hello"])
+        await store.get_conversation("a")
+        await store.save_conversation("c", ["hey"])
+
+        assert sorted(await store.get_all_sessions()) == ["a", "c"]
+        assert store.stats()["evictions"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_in_memory_store_byte_budget_and_idle_expiry():
+    async def scenario():
+        store = InMemorySessionStore(max_bytes=100)
+        await store.save_conversation("small", ["x"])
+        await store.save_conversation("big", ["y" * 95])
+
+        assert await store.get_all_sessions() == ["big"]
+        assert store.stats()["approx_bytes"] <= 100
+
+        store.idle_ttl_seconds = 0
+        assert await store.get_conversation("big") == []
+        stats = store.stats()
+        assert (stats["hits"], stats["misses"], stats["expirations"]) == (0, 1, 1)
+
+    asyncio.run(scenario())
+
+
+def test_list_sessions_pages_with_cursor():
+    async def scenario():
+        store = InMemorySessionStore()
+        for session_id in "abcde":
+            await store.save_conversation(session_id, [])
+
+        first, cursor = await store.list_sessions(limit=2)
+        second, cursor = await store.list_sessions(cursor=cursor, limit=2)
+        third, cursor = await store.list_sessions(cursor=cursor, limit=2)
+
+        assert first + second + third == list("abcde")
+        assert cursor is None
+
+    asyncio.run(scenario())
+
+
+def test_append_messages_and_last_k():
+    async def scenario():
+        store = InMemorySessionStore()
+        history = await store.get_conversation("s")
+        history += ["q1", "a1"]
+        await store.append_messages("s", history[0:])
+
+        history = await store.get_conversation("s")
+        stored = len(history)
+        history += ["q2", "a2"]
+        await store.append_messages("s", history[stored:])
+
+        assert await store.get_conversation("s") == ["q1", "a1", "q2", "a2"]
+        assert await store.get_conversation("s", last_k=2) == ["q2", "a2"]
+
+    asyncio.run(scenario())
+
+
+def test_local_tier_applies_versions_and_invalidations():
+    from session_store import CachedRedisSessionStore
+
+    async def scenario():
+        store = CachedRedisSessionStore(local_max_sessions=2)
+        store._publish = lambda session_id, version: asyncio.sleep(0)
+
+        await store._written("s", [1, True], replaced=["q1"])
+        await store._written("s", [2, True], appended=["a1"])
+        assert store.local["s"] == [2, ["q1", "a1"]]
+
+        # Another replica wrote version 4: our copy is stale
+        await store._written("s", [5, True], appended=["q3"])
+        assert "s" not in store.local
+
+        await store._written("s", [5, True], replaced=["q1"])
+        store._invalidate(f"5 {store.instance_id} s".encode())
+        store._invalidate(b"4 other-replica s")
+        assert "s" in store.local
+        store._invalidate(b"6 other-replica s")
+        assert "s" not in store.local
+        assert store.stats()["invalidations"] == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,112 @@
+"""
+Tests for the shared Temporal client manager (Client.connect stubbed)
+"""
+import asyncio
+import types
+
+import pytest
+
+import temporal_client
+from temporal_client import TemporalClientManager
+
+
+class FakeServiceClient:
+    def __init__(self):
+        self.checks = 0
+        self.failures = 0
+
+    async def check_health(self, timeout=None):
+        self.checks += 1
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("channel closed")
+        return True
+
+
+@pytest.fixture
+def connects(monkeypatch):
+    """Every Client.connect call, in order; each returns a new fake client"""
+    calls = []
+
+    async def connect(host, **kwargs):
+        calls.append(host)
+        await asyncio.sleep(0.01)  # Long enough for concurrent callers to pile up
+        return types.SimpleNamespace(service_client=FakeServiceClient(), number=len(calls))
+
+    monkeypatch.setattr(temporal_client.Client, "connect", connect)
+    return calls
+
+
+def test_concurrent_callers_share_one_connect(connects):
+    async def scenario():
+        manager = TemporalClientManager(host="temporal:7233")
+        clients = await asyncio.gather(*(manager.get_client() for _ in range(10)))
+
+        assert connects == ["temporal:7233"]
+        assert all(client is clients[0] for client in clients)
+        assert await manager.get_client() is clients[0]
+
+    asyncio.run(scenario())
+
+
+def test_failed_probe_reconnects_on_next_use(connects):
+    async def scenario():
+        manager = TemporalClientManager(host="temporal:7233")
+        first = await manager.get_client()
+        first.service_client.failures = 1
+
+        health = await manager.probe()
+        assert health["status"] == "disconnected"
+        assert health["error"] == "channel closed"
+
+        second = await manager.get_client()
+        assert second is not first
+        assert len(connects) == 2
+        assert (await manager.probe())["status"] == "connected"
+
+    asyncio.run(scenario())
+
+
+def test_failed_connect_is_retried(monkeypatch):
+    attempts = []
+
+    async def connect(host, **kwargs):
+        attempts.append(host)
+        if len(attempts) == 1:
+            raise RuntimeError("connection refused")
+        return types.SimpleNamespace(service_client=FakeServiceClient())
+
+    monkeypatch.setattr(temporal_client.Client, "connect", connect)
+
+    async def scenario():
+        manager = TemporalClientManager(host="temporal:7233")
+        # Startup survives Temporal being down
+        await manager.start()
+        await asyncio.sleep(0)  # Let the probe loop run its first check
+        await manager.stop()
+
+        assert len(attempts) == 2  # The first probe connected
+        assert manager._client is not None
+        assert manager.health["status"] == "connected"
+
+    asyncio.run(scenario())
+
+
+def test_health_is_served_from_the_cached_probe(connects):
+    async def scenario():
+        manager = TemporalClientManager(host="temporal:7233", probe_interval_seconds=3600)
+        assert manager.health["status"] == "unknown"
+
+        await manager.start()
+        await asyncio.sleep(0)  # Let the probe loop run its first check
+        client = await manager.get_client()
+        health = manager.health
+        for _ in range(5):
+            assert manager.health is health
+        await manager.stop()
+
+        assert health["status"] == "connected"
+        assert health["checked_at"] is not None
+        assert client.service_client.checks == 1
+
+    asyncio.run(scenario())
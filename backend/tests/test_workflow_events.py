@@ -0,0 +1,169 @@
+"""
+Tests for WorkflowEventHub (Temporal client faked with an in-memory WorkflowState)
+"""
+import asyncio
+
+from dynamic_workflow import WorkflowState
+import workflow_events
+from workflow_events import WorkflowEventHub
+
+
+class FakeHandle:
+    def __init__(self, state):
+        self.state = state
+        self.queries = []
+
+    async def query(self, query, after_seq):
+        self.queries.append(after_seq)
+        return self.state.events_after(after_seq)
+
+
+class FakeClient:
+    def __init__(self, state):
+        self.handle = FakeHandle(state)
+
+    def get_workflow_handle(self, workflow_id):
+        return self.handle
+
+
+def _hub(state):
+    client = FakeClient(state)
+
+    async def get_client():
+        return client
+
+    return WorkflowEventHub(get_client, min_poll_seconds=0.001, max_poll_seconds=0.005), client.handle
+
+
+def _record(state, count):
+    for _ in range(count):
+        state.record_event("node_completed", at="t")
+
+
+async def _drain(queue):
+    events = []
+    while True:
+        event = await asyncio.wait_for(queue.get(), timeout=2)
+        if event is None:
+            return events
+        events.append(event)
+
+
+async def _wait_until(condition):
+    for _ in range(1000):
+        if condition():
+            return
+        await asyncio.sleep(0.001)
+    raise AssertionError("condition not reached")
+
+
+def test_subscribers_share_one_poller_and_end_on_terminal_event():
+    async def scenario():
+        state = WorkflowState()
+        _record(state, 3)
+        hub, handle = _hub(state)
+
+        async with hub.subscribe("wf") as first, hub.subscribe("wf") as second:
+            state.record_event("workflow_completed", at="t")
+            first_events, second_events = await _drain(first), await _drain(second)
+
+        assert [e["seq"] for e in first_events] == [1, 2, 3, 4]
+        assert [e["seq"] for e in second_events] == [1, 2, 3, 4]
+        assert hub._pollers == {}
+
+    asyncio.run(scenario())
+
+
+def test_late_subscriber_behind_the_poller_is_backfilled():
+    async def scenario():
+        state = WorkflowState()
+        _record(state, 60)
+        hub, handle = _hub(state)
+
+        async with hub.subscribe("wf", after_seq=50) as first:
+            await _wait_until(lambda: first.qsize() == 10)
+            async with hub.subscribe("wf", after_seq=0) as late:
+                _record(state, 1)
+                state.record_event("workflow_completed", at="t")
+                first_events, late_events = await _drain(first), await _drain(late)
+
+        assert [e["seq"] for e in first_events] == list(range(51, 63))
+        # 1-60 from the backfill query, then the shared stream without duplicates
+        assert [e["seq"] for e in late_events] == list(range(1, 63))
+        assert 0 in handle.queries
+
+    asyncio.run(scenario())
+
+
+def test_late_subscriber_gets_a_gap_marker_when_history_is_gone():
+    async def scenario():
+        state = WorkflowState()
+        _record(state, 5)
+        hub, handle = _hub(state)
+
+        async with hub.subscribe("wf", after_seq=2) as first:
+            await _wait_until(lambda: first.qsize() == 3)
+            state.events.clear()  # Older events already left the workflow's buffer
+            async with hub.subscribe("wf", after_seq=0) as late:
+                state.record_event("workflow_completed", at="t")
+                late_events = await _drain(late)
+
+        assert late_events[0] == {"seq": 0, "type": "events_dropped"}
+        assert [e["seq"] for e in late_events[1:]] == [3, 4, 5, 6]
+
+    asyncio.run(scenario())
+
+
+def test_subscriber_within_the_replay_buffer_is_not_backfilled():
+    async def scenario():
+        state = WorkflowState()
+        _record(state, 10)
+        hub, handle = _hub(state)
+
+        async with hub.subscribe("wf", after_seq=5) as first:
+            await _wait_until(lambda: first.qsize() == 5)
+            async with hub.subscribe("wf", after_seq=7) as late:
+                state.record_event("workflow_completed", at="t")
+                late_events = await _drain(late)
+
+        assert [e["seq"] for e in late_events] == [8, 9, 10, 11]
+        assert 7 not in handle.queries
+
+    asyncio.run(scenario())
+
+
+def test_replay_buffer_overflow_moves_the_backfill_floor(monkeypatch):
+    monkeypatch.setattr(workflow_events, "RECENT_EVENTS", 8)
+
+    async def scenario():
+        state = WorkflowState()
+        hub, handle = _hub(state)
+
+        async with hub.subscribe("wf") as first:
+            _record(state, 20)
+            await _wait_until(lambda: first.qsize() == 20)
+            assert hub._held_after["wf"] == 12
+
+            async with hub.subscribe("wf", after_seq=5) as late:
+                state.record_event("workflow_completed", at="t")
+                late_events = await _drain(late)
+
+        assert [e["seq"] for e in late_events] == list(range(6, 22))
+        assert 5 in handle.queries
+
+    asyncio.run(scenario())
+
+
+def test_query_failure_ends_the_stream_with_an_error_marker():
+    async def scenario():
+        async def get_client():
+            raise RuntimeError("workflow not found")
+
+        hub = WorkflowEventHub(get_client, min_poll_seconds=0.001)
+        async with hub.subscribe("wf") as queue:
+            events = await _drain(queue)
+
+        assert [e["type"] for e in events] == ["stream_error"]
+        assert "workflow not found" in events[0]["error"]
+
+    asyncio.run(scenario())
@@ -0,0 +1,67 @@
+"""
+Tests for the workflow list query, cursors and definition/facility tagging
+"""
+from datetime import datetime, timezone
+
+import pytest
+
+import workflow_listing
+from workflow_listing import build_list_query, decode_cursor, encode_cursor, run_search_attributes
+
+
+def test_list_query_combines_filters(monkeypatch):
+    monkeypatch.setattr(workflow_listing, "DEFINITION_SEARCH_ATTRIBUTE", None)
+    query = build_list_query(
+        status="running",
+        definition_id="dock-o'brien",
+        started_after=datetime(2026, 1, 1, tzinfo=timezone.utc),
+    )
+
+    assert query == (
+        "WorkflowType = 'VisualWorkflowExecutor' AND ExecutionStatus = 'Running' "
+        "AND WorkflowId STARTS_WITH 'dock-o\\'brien-' "
+        "AND StartTime >= '2026-01-01T00:00:00+00:00' ORDER BY StartTime DESC"
+    )
+
+
+def test_list_query_rejects_unknown_status():
+    with pytest.raises(ValueError):
+        build_list_query(status="sleeping")
+
+
+def test_facility_filter_requires_search_attribute(monkeypatch):
+    monkeypatch.setattr(workflow_listing, "FACILITY_SEARCH_ATTRIBUTE", None)
+    with pytest.raises(ValueError):
+        build_list_query(facility_id="CHI-01")
+    assert run_search_attributes("dock", "CHI-01") is None
+
+    monkeypatch.setattr(workflow_listing, "FACILITY_SEARCH_ATTRIBUTE", "FacilityId")
+    assert build_list_query(facility_id="CHI-01").startswith(
+        "WorkflowType = 'VisualWorkflowExecutor' AND FacilityId = 'CHI-01'"
+    )
+    pairs = run_search_attributes("dock", "CHI-01").search_attributes
+    assert [(pair.key.name, pair.value) for pair in pairs] == [("FacilityId", "CHI-01")]
+
+
+def test_definition_filter_uses_search_attribute(monkeypatch):
+    monkeypatch.setattr(workflow_listing, "DEFINITION_SEARCH_ATTRIBUTE", "DefinitionId")
+    monkeypatch.setattr(workflow_listing, "FACILITY_SEARCH_ATTRIBUTE", "FacilityId")
+
+    # Exact match: "delay-check" no longer matches "delay-check-v2-..." runs
+    assert build_list_query(definition_id="delay-check") == (
+        "WorkflowType = 'VisualWorkflowExecutor' AND DefinitionId = 'delay-check' ORDER BY StartTime DESC"
+    )
+    pairs = run_search_attributes("delay-check", None).search_attributes
+    assert [(pair.key.name, pair.value) for pair in pairs] == [("DefinitionId", "delay-check")]
+    pairs = run_search_attributes("delay-check", "CHI-01").search_attributes
+    assert [(pair.key.name, pair.value) for pair in pairs] == [("DefinitionId", "delay-check"), ("FacilityId", "CHI-01")]
+
+
+def test_cursor_round_trip():
+    token = b"\x00\xffpage-2"
+
+    assert decode_cursor(encode_cursor(token)) == token
+    assert encode_cursor(None) is None
+    assert decode_cursor(None) is None
+    with pytest.raises(ValueError):
+        decode_cursor("not base64!")
@@ -0,0 +1,277 @@
+"""
+Tests for the compiled workflow plan (node index + routing tables)
+"""
+import pytest
+
+from workflow_plan import compile_workflow
+
+
+def _router_workflow():
+    return {
+        "nodes": [
+            {"id": "parse", "activity": "parse_email_response_real"},
+            {"id": "done", "activity": "log_activity"},
+            {"id": "followup", "activity": "send_email_level2_followup_real"},
+            {"id": "escalate", "activity": "send_email_level3_escalation_real"},
+        ],
+        "edges": [
+            {"source": "parse", "target": "done", "label": "complete"},
+            {"source": "parse", "target": "followup", "label": "partial"},
+            {"source": "parse", "target": "escalate", "label": "incomplete/gibberish"},
+            {"source": "followup", "target": "parse"},
+        ],
+    }
+
+
+def test_compile_indexes_nodes_and_start():
+    plan = compile_workflow(_router_workflow())
+
+    assert plan.start_node_id == "parse"
+    assert plan.get_node("followup")["activity"] == "send_email_level2_followup_real"
+    assert plan.get_node("missing") is None
+
+
+def test_compile_rejects_empty_workflow():
+    with pytest.raises(ValueError):
+        compile_workflow({"nodes": [], "edges": []})
+
+
+@pytest.mark.parametrize("result, expected", [
+    ({"completeness": "complete"}, "done"),
+    ({"completeness": "partial"}, "followup"),
+    ({"completeness": "incomplete"}, "escalate"),
+    ({"completeness": "complete", "is_gibberish": True}, "escalate"),
+    ({"status": "unknown"}, "done"),
+    (None, "done"),
+])
+def test_route_by_completeness(result, expected):
+    plan = compile_workflow(_router_workflow())
+
+    assert plan.route("parse", result)[0] == expected
+
+
+def test_route_fallback_labels_and_status():
+    plan = compile_workflow({
+        "nodes": [{"id": "a"}, {"id": "b"}, {"id": "c"}],
+        "edges": [
+            {"source": "a", "target": "b", "label": "gibberish"},
+            {"source": "a", "target": "c", "label": "failed"},
+        ],
+    })
+
+    assert plan.route("a", {"completeness": "incomplete"}) == ("b", "incomplete")
+    assert plan.route("a", {"status": "failed"}) == ("c", "failed")
+
+
+def test_route_single_edge_and_end():
+    plan = compile_workflow(_router_workflow())
+
+    assert plan.route("followup", {"status": "sent"}) == ("parse", "single")
+    assert plan.route("done", {}) == (None, "end")
+
+
+def test_unlabeled_multi_edges_fan_out():
+    plan = compile_workflow({
+        "nodes": [
+            {"id": "start"}, {"id": "l1"}, {"id": "l2"},
+            {"id": "join", "type": "join", "params": {"mode": "first_n", "count": "2"}},
+        ],
+        "edges": [
+            {"source": "start", "target": "l1"},
+            {"source": "start", "target": "l2"},
+            {"source": "l1", "target": "join"},
+            {"source": "l2", "target": "join"},
+        ],
+    })
+
+    assert plan.get_routes("start").fan_out
+    assert plan.get_routes("start").targets == ("l1", "l2")
+    assert not plan.get_routes("l1").fan_out
+    assert plan.joins["join"].mode == "first_n"
+    assert plan.joins["join"].quorum(2) == 2
+    assert plan.joins["join"].quorum(1) == 1
+
+
+def test_nodes_with_declared_branches_never_fan_out():
+    plan = compile_workflow({
+        "nodes": [
+            {"id": "parse", "activity": "parse_email_response_ai", "branches": ["complete", "partial", "incomplete/gibberish"]},
+            {"id": "followup"}, {"id": "escalate"},
+        ],
+        "edges": [
+            {"source": "parse", "target": "followup"},
+            {"source": "parse", "target": "escalate"},
+        ],
+    })
+
+    assert not plan.get_routes("parse").fan_out
+    assert plan.route("parse", {"status": "ok"})[0] == "followup"
+
+
+def test_labeled_edges_never_fan_out():
+    plan = compile_workflow(_router_workflow())
+
+    assert not plan.get_routes("parse").fan_out
+
+
+def test_join_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        compile_workflow({"nodes": [{"id": "j", "type": "join", "params": {"mode": "most"}}]})
+
+
+def test_continue_as_new_limits_from_config():
+    data = _router_workflow()
+    data["config"] = {"continue_as_new_after_steps": "50", "max_history_events": 2000}
+
+    plan = compile_workflow(data)
+
+    assert plan.continue_as_new_steps == 50
+    assert plan.max_history_events == 2000
+
+
+def test_activity_options_default_and_override():
+    from datetime import timedelta
+
+    plan = compile_workflow({
+        "nodes": [
+            {"id": "log", "activity": "log_activity"},
+            {
+                "id": "pdf",
+                "activity": "extract_data_from_pdf",
+                "activity_options": {
+                    "start_to_close_timeout": 900,
+                    "heartbeat_timeout": 30,
+                    "retry": {"initial_interval": 10, "non_retryable_error_types": ["ValueError"]},
+                },
+            },
+        ],
+    })
+
+    default = plan.get_activity_options("log")
+    assert default["start_to_close_timeout"] == timedelta(seconds=120)
+    assert default["retry_policy"].maximum_attempts == 3
+
+    custom = plan.get_activity_options("pdf")
+    assert custom["start_to_close_timeout"] == timedelta(seconds=900)
+    assert custom["heartbeat_timeout"] == timedelta(seconds=30)
+    assert custom["retry_policy"].initial_interval == timedelta(seconds=10)
+    assert custom["retry_policy"].maximum_attempts == 3
+    assert custom["retry_policy"].non_retryable_error_types == ["ValueError"]
+
+
+def test_execution_modes():
+    plan = compile_workflow({
+        "nodes": [
+            {"id": "send", "activity": "send_email_level1_real"},
+            {"id": "unflagged", "activity": "increment_escalation_counter"},
+            {"id": "count", "activity": "increment_escalation_counter", "execution": "inline"},
+            {"id": "forced", "activity": "send_test_email_real", "execution": "local"},
+            {"id": "no_port", "activity": "log_activity", "execution": "inline"},
+        ],
+    })
+
+    assert plan.get_execution_mode("send") == "remote"
+    # No execution flag in the definition: stays remote, as runs started before the flags existed expect
+    assert plan.get_execution_mode("unflagged") == "remote"
+    assert plan.get_execution_mode("count") == "inline"
+    assert plan.get_execution_mode("forced") == "local"
+    assert plan.get_execution_mode("no_port") == "local"
+
+
+def test_conditional_router_targets():
+    plan = compile_workflow({
+        "nodes": [
+            {"id": "parse", "activity": "parse_email_response_real"},
+            {"id": "router", "activity": "route_by_condition",
+             "params": {"condition_field": "status", "operator": "equals", "condition_value": "success"}},
+            {"id": "yes"}, {"id": "no"},
+        ],
+        "edges": [
+            {"source": "parse", "target": "router"},
+            {"source": "router", "target": "yes"},
+            {"source": "router", "target": "no"},
+        ],
+    })
+
+    assert not plan.get_routes("router").fan_out
+    assert "router" not in plan.execution_modes
+    assert plan.routers["router"].condition({"status": "success"})
+    assert plan.route("router", {"condition_met": True}) == ("yes", "true")
+    assert plan.route("router", {"condition_met": False}) == ("no", "false")
+
+
+def test_reply_wait_targets_and_filters():
+    plan = compile_workflow({
+        "nodes": [
+            {"id": "wait", "activity": "wait_for_reply",
+             "params": {"timeout": "2", "unit": "hours", "from_filter": "acme.com"}},
+            {"id": "parse"}, {"id": "escalate"},
+        ],
+        "edges": [
+            {"source": "wait", "target": "escalate", "label": "timeout"},
+            {"source": "wait", "target": "parse"},
+        ],
+    })
+
+    wait = plan.reply_waits["wait"]
+    assert wait.timeout_seconds == 7200
+    assert wait.matches({"from_email": "Ops@ACME.com"})
+    assert not wait.matches({"from_email": "someone@else.com"})
+    assert plan.route("wait", {"status": "replied"}) == ("parse", "replied")
+    assert plan.route("wait", {"status": "timeout"}) == ("escalate", "timeout")
+    assert not plan.get_routes("wait").fan_out
+
+
+def test_guessed_labels_fall_back_to_edge_order():
+    # _normalize_graph labels targets named *complete*/*escalat*; those are not branch labels
+    plan = compile_workflow({
+        "nodes": [
+            {"id": "router", "activity": "route_by_condition",
+             "params": {"condition_field": "status", "operator": "equals", "condition_value": "ok"}},
+            {"id": "wait", "activity": "wait_for_reply", "params": {"timeout": 1}},
+            {"id": "mark_complete"}, {"id": "send_followup"}, {"id": "parse"}, {"id": "escalate_mgr"},
+        ],
+        "edges": [
+            {"source": "router", "target": "mark_complete", "label": "complete"},
+            {"source": "router", "target": "send_followup"},
+            {"source": "wait", "target": "parse"},
+            {"source": "wait", "target": "escalate_mgr", "label": "incomplete/gibberish"},
+        ],
+    })
+
+    assert plan.route("router", {"condition_met": True}) == ("mark_complete", "true")
+    assert plan.route("router", {"condition_met": False}) == ("send_followup", "false")
+    assert plan.route("wait", {"status": "replied"}) == ("parse", "replied")
+    assert plan.route("wait", {"status": "timeout"}) == ("escalate_mgr", "timeout")
+
+
+def _binding_workflow(recipient):
+    return {
+        "nodes": [
+            {"id": "parse", "activity": "parse_email_response_real"},
+            {"id": "followup", "activity": "send_email_level2_followup_real",
+             "params": {"recipient_email": recipient, "workflow_id": "{{workflow.id}}"}},
+            {"id": "done", "activity": "log_activity"},
+        ],
+        "edges": [
+            {"source": "parse", "target": "followup"},
+            {"source": "followup", "target": "parse", "label": "retry"},
+            {"source": "parse", "target": "done", "label": "complete"},
+        ],
+    }
+
+
+def test_bindings_to_upstream_nodes_compile():
+    # Including a node's own earlier result inside a loop
+    plan = compile_workflow(_binding_workflow("{{parse.contact.email}} / {{followup.sent_to}}"))
+
+    assert plan.referenced_nodes == {"parse", "followup"}
+
+
+@pytest.mark.parametrize("recipient, message", [
+    ("{{parser.contact.email}}", "unknown node.*parser"),
+    ("{{done.contact.email}}", "do not run before it: done"),
+])
+def test_bindings_must_read_upstream_nodes(recipient, message):
+    with pytest.raises(ValueError, match=message):
+        compile_workflow(_binding_workflow(recipient))
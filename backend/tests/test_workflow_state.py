@@ -0,0 +1,80 @@
+"""
+Tests for WorkflowState query views (projection, paging, summary, progress events)
+"""
+from dynamic_workflow import EVENT_BUFFER_SIZE, WorkflowState
+
+
+def _state():
+    state = WorkflowState()
+    state.set_node_result("send", {"status": "sent", "sent_to": "ops@acme.com"})
+    state.set_node_result("inbox", {"status": "success", "emails": [{"body_full": "x" * 1000}]})
+    state.set_node_result("parse", {"status": "success", "reply": {"message_id": "m1"}})
+    state.running_nodes.append("escalate")
+    return state
+
+
+def test_view_projects_fields_and_pages():
+    view = _state().view({"fields": ["status", "reply.message_id"], "offset": 1, "limit": 1})
+
+    assert view["node_results"] == {"inbox": {"status": "success"}}
+    assert view["total_nodes"] == 3
+    assert view["next_offset"] == 2
+    assert "execution_path" not in view
+
+
+def test_view_paging_always_advances():
+    view = _state().view({"offset": 1, "limit": 0})
+
+    assert list(view["node_results"]) == ["inbox"]
+    assert view["next_offset"] == 2
+
+
+def test_view_filters_nodes():
+    view = _state().view({"nodes": ["parse", "unknown"], "fields": ["reply.message_id"], "include_path": True})
+
+    assert view["node_results"] == {"parse": {"reply.message_id": "m1"}}
+    assert view["next_offset"] is None
+    assert view["execution_path"] == ["send", "inbox", "parse"]
+
+
+def test_summary_has_no_results():
+    summary = _state().summary()
+
+    assert summary["current_nodes"] == ["escalate"]
+    assert summary["node_status"] == {"send": "sent", "inbox": "success", "parse": "success", "escalate": "running"}
+    assert summary["step_count"] == 3
+    assert "node_results" not in summary
+
+
+def test_events_after_returns_newer_events():
+    state = WorkflowState()
+    state.record_event("node_started", "t0", node_id="send")
+    state.record_event("node_completed", "t1", node_id="send", status="sent")
+    state.record_event("route_taken", "t1", node_id="send", target="inbox", reason="single")
+
+    batch = state.events_after(1)
+
+    assert [event["type"] for event in batch["events"]] == ["node_completed", "route_taken"]
+    assert batch["last_seq"] == 3
+    assert batch["dropped"] is False
+    assert state.events_after(3)["events"] == []
+
+
+def test_events_after_reports_dropped_events():
+    state = WorkflowState()
+    for index in range(EVENT_BUFFER_SIZE + 5):
+        state.record_event("node_started", "t", node_id=f"n{index}")
+
+    assert state.events_after(0)["dropped"] is True
+    assert state.events_after(5)["dropped"] is False
+
+
+def test_event_seq_continues_across_snapshot():
+    state = _state()
+    state.record_event("node_started", "t", node_id="escalate")
+
+    resumed = WorkflowState()
+    resumed.restore(state.snapshot("escalate", "parse", []))
+    resumed.record_event("node_completed", "t", node_id="escalate")
+
+    assert [event["seq"] for event in resumed.events_after(0)["events"]] == [1, 2]
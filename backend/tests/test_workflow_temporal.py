@@ -0,0 +1,124 @@
+"""
+Executor tests on Temporal's time-skipping test server (skipped when it cannot be
+started - the SDK downloads the server binary on first use)
+"""
+import asyncio
+import uuid
+
+import pytest
+from temporalio import activity
+from temporalio.testing import WorkflowEnvironment
+from temporalio.worker import Worker
+
+from dynamic_workflow import VisualWorkflowExecutor
+
+steps = []
+
+
+@activity.defn(name="record_step")
+async def record_step(params):
+    steps.append(params["step"])
+    return {"status": "ok", "step": params["step"]}
+
+
+def run_in_environment(scenario):
+    async def main():
+        try:
+            env = await WorkflowEnvironment.start_time_skipping()
+        except RuntimeError as e:
+            pytest.skip(f"Temporal test server unavailable: {e}")
+        try:
+            task_queue = f"test-{uuid.uuid4()}"
+            async with Worker(
+                env.client,
+                task_queue=task_queue,
+                workflows=[VisualWorkflowExecutor],
+                activities=[record_step],
+            ):
+                await scenario(env.client, task_queue)
+        finally:
+            await env.shutdown()
+
+    steps.clear()
+    asyncio.run(main())
+
+
+async def start(client, task_queue, workflow_data):
+    return await client.start_workflow(
+        VisualWorkflowExecutor.run,
+        workflow_data,
+        id=f"wf-{uuid.uuid4()}",
+        task_queue=task_queue,
+    )
+
+
+def test_run_continues_as_new_and_resumes_from_its_snapshot():
+    workflow_data = {
+        "config": {"continue_as_new_after_steps": 2},
+        "nodes": [{"id": f"s{i}", "activity": "record_step", "params": {"step": i}} for i in range(5)],
+        "edges": [{"source": f"s{i}", "target": f"s{i + 1}"} for i in range(4)],
+    }
+
+    async def scenario(client, task_queue):
+        handle = await start(client, task_queue, workflow_data)
+        first_run_id = handle.first_execution_run_id
+
+        # result() follows the chain of continued runs
+        result = await handle.result()
+
+        assert (result["total_steps"], result["continuations"]) == (5, 2)
+        assert result["execution_path"] == ["s4"]
+        assert steps == [0, 1, 2, 3, 4]
+        latest = await client.get_workflow_handle(handle.id).describe()
+        assert latest.run_id != first_run_id
+        # Progress events survive the continuations
+        events = await client.get_workflow_handle(handle.id).query(VisualWorkflowExecutor.get_events, 0)
+        types = [event["type"] for event in events["events"]]
+        assert types.count("continued_as_new") == 2
+        assert types[-1] == "workflow_completed"
+
+    run_in_environment(scenario)
+
+
+def reply_wait_definition():
+    return {
+        "nodes": [
+            {"id": "wait", "activity": "wait_for_reply",
+             "params": {"timeout": 48, "unit": "hours", "from_filter": "acme.com"}},
+            {"id": "on_reply", "activity": "record_step", "params": {"step": "replied"}},
+            {"id": "on_timeout", "activity": "record_step", "params": {"step": "timeout"}},
+        ],
+        "edges": [
+            {"source": "wait", "target": "on_reply", "label": "replied"},
+            {"source": "wait", "target": "on_timeout", "label": "timeout"},
+        ],
+    }
+
+
+def test_reply_wait_times_out_on_a_durable_timer():
+    async def scenario(client, task_queue):
+        handle = await start(client, task_queue, reply_wait_definition())
+
+        # The test server skips the 48 hours while we wait for the result
+        result = await handle.result()
+
+        assert result["execution_path"] == ["wait", "on_timeout"]
+        assert result["final_results"]["wait"] == {"status": "timeout", "waited_seconds": 48 * 3600}
+        assert steps == ["timeout"]
+
+    run_in_environment(scenario)
+
+
+def test_reply_wait_takes_the_reply_received_signal():
+    async def scenario(client, task_queue):
+        handle = await start(client, task_queue, reply_wait_definition())
+
+        await handle.signal(VisualWorkflowExecutor.reply_received, {"message_id": "m1", "from_email": "x@other.com"})
+        await handle.signal(VisualWorkflowExecutor.reply_received, {"message_id": "m2", "from_email": "dock@acme.com"})
+        result = await handle.result()
+
+        assert result["execution_path"] == ["wait", "on_reply"]
+        assert result["final_results"]["wait"]["reply"]["message_id"] == "m2"
+        assert steps == ["replied"]
+
+    run_in_environment(scenario)
@@ -701,6 +701,11 @@ FOURKITES_ACTION_BLOCKS = {
         "icon": "⚖️",
         "color": "#6366F1",
         "activity": check_escalation_limit,
+        "execution": "inline",  # Lightweight - skip the task-queue round trip
+        "activity_options": {
+            "start_to_close_timeout": 10,
+            "retry": {"maximum_attempts": 3, "initial_interval": 1, "maximum_interval": 5}
+        },
         "config_fields": [
             {"name": "max_escalations", "type": "number", "default": 2}
         ],
@@ -758,6 +763,11 @@ FOURKITES_ACTION_BLOCKS = {
         "icon": "➕",
         "color": "#64748B",
         "activity": increment_escalation_counter,
+        "execution": "inline",  # Lightweight - skip the task-queue round trip
+        "activity_options": {
+            "start_to_close_timeout": 10,
+            "retry": {"maximum_attempts": 3, "initial_interval": 1, "maximum_interval": 5}
+        },
         "config_fields": []
     },
     "log_workflow_action": {
@@ -768,6 +778,11 @@ FOURKITES_ACTION_BLOCKS = {
         "icon": "📝",
         "color": "#64748B",
         "activity": log_workflow_action,
+        "execution": "local",  # Lightweight - skip the task-queue round trip
+        "activity_options": {
+            "start_to_close_timeout": 10,
+            "retry": {"maximum_attempts": 3, "initial_interval": 1, "maximum_interval": 5}
+        },
         "config_fields": [
             {"name": "action_type", "type": "string", "required": True},
             {"name": "action_count", "type": "number", "default": 1}
@@ -494,6 +494,11 @@ REAL_EMAIL_ACTION_BLOCKS = {
         "icon": "📧",
         "color": "#3b82f6",
         "activity_function": "send_email_level1_real",  # Maps to actual activity function
+        # Throttled SMTP: fewer, slower retries; bad input is not worth retrying
+        "activity_options": {
+            "start_to_close_timeout": 60,
+            "retry": {"maximum_attempts": 4, "initial_interval": 30, "backoff_coefficient": 2.0, "maximum_interval": 600, "non_retryable_error_types": ["ValueError"]}
+        },
         "config_fields": [
             {"name": "facility", "type": "string", "required": True},
             {"name": "recipient_email", "type": "email", "required": True, "description": "Recipient email address"},
@@ -512,6 +517,11 @@ REAL_EMAIL_ACTION_BLOCKS = {
         "icon": "📨",
         "color": "#8B5CF6",
         "activity_function": "send_email_level2_followup_real",  # Maps to actual activity function
+        # Throttled SMTP: fewer, slower retries; bad input is not worth retrying
+        "activity_options": {
+            "start_to_close_timeout": 60,
+            "retry": {"maximum_attempts": 4, "initial_interval": 30, "backoff_coefficient": 2.0, "maximum_interval": 600, "non_retryable_error_types": ["ValueError"]}
+        },
         "config_fields": [
             {"name": "facility", "type": "string", "required": True},
             {"name": "recipient_email", "type": "email", "required": True},
@@ -527,6 +537,11 @@ REAL_EMAIL_ACTION_BLOCKS = {
         "icon": "🚨",
         "color": "#ef4444",
         "activity_function": "send_email_level3_escalation_real",  # Maps to actual activity function
+        # Throttled SMTP: fewer, slower retries; bad input is not worth retrying
+        "activity_options": {
+            "start_to_close_timeout": 60,
+            "retry": {"maximum_attempts": 4, "initial_interval": 30, "backoff_coefficient": 2.0, "maximum_interval": 600, "non_retryable_error_types": ["ValueError"]}
+        },
         "config_fields": [
             {"name": "facility", "type": "string", "required": True},
             {"name": "escalation_recipient", "type": "email", "required": True, "description": "Manager or supervisor email"},
@@ -544,6 +559,10 @@ REAL_EMAIL_ACTION_BLOCKS = {
         "icon": "📬",
         "color": "#3b82f6",
         "activity_function": "check_email_inbox",  # TODO: Implement this activity
+        "activity_options": {
+            "start_to_close_timeout": 60,
+            "retry": {"maximum_attempts": 3, "initial_interval": 5, "maximum_interval": 60}
+        },
         "config_fields": [
             {"name": "subject_filter", "type": "string", "required": False},
             {"name": "from_filter", "type": "email", "required": False},
@@ -551,6 +570,22 @@ REAL_EMAIL_ACTION_BLOCKS = {
             {"name": "mark_as_read", "type": "boolean", "required": False, "default": False}
         ]
     },
+    "wait_for_reply": {
+        "name": "Wait for Reply",
+        "category": "Email",
+        "description": "Pause until a reply is delivered to the workflow (reply_received signal) or the timeout passes",
+        "action_count": 0,
+        "icon": "📩",
+        "color": "#3b82f6",
+        "activity_function": "wait_for_reply",  # Handled by the workflow executor, no inbox polling
+        "config_fields": [
+            {"name": "timeout", "type": "integer", "required": False, "default": 24, "description": "How long to wait before taking the timeout branch"},
+            {"name": "unit", "type": "select", "required": False, "options": ["minutes", "hours", "days"], "default": "hours"},
+            {"name": "from_filter", "type": "string", "required": False, "description": "Only accept replies from this sender/domain"},
+            {"name": "subject_filter", "type": "string", "required": False}
+        ],
+        "branches": ["replied", "timeout"]
+    },
     "parse_email_response": {
         "name": "Parse Email Response (AI)",
         "category": "Email",
@@ -559,13 +594,18 @@ REAL_EMAIL_ACTION_BLOCKS = {
         "icon": "🤖",
         "color": "#8B5CF6",
         "activity_function": "parse_email_response_ai",  # TODO: Implement this activity
+        "activity_options": {
+            "start_to_close_timeout": 180,
+            "retry": {"maximum_attempts": 3, "initial_interval": 5, "maximum_interval": 60}
+        },
         "config_fields": [
             {"name": "email_body", "type": "string", "required": False},
             {"name": "subject_filter", "type": "string", "required": False},
             {"name": "from_email", "type": "email", "required": False},
             {"name": "auto_fetch", "type": "boolean", "required": False, "default": True},
             {"name": "since_hours", "type": "integer", "required": False}
-        ]
+        ],
+        "branches": ["complete", "partial", "incomplete/gibberish"]
     },
     "wait_timer": {
         "name": "Wait Timer",
@@ -587,7 +627,7 @@ REAL_EMAIL_ACTION_BLOCKS = {
         "action_count": 1,
         "icon": "🔀",
         "color": "#F59E0B",
-        "activity_function": "route_by_condition",  # TODO: Implement this activity
+        "activity_function": "route_by_condition",  # Evaluated inside the workflow (backend/app/conditions.py)
         "config_fields": [
             {"name": "condition_field", "type": "string", "required": True, "description": "Field to check"},
             {"name": "operator", "type": "select", "required": True, "options": ["equals", "not_equals", "contains", "greater_than", "less_than"]},
@@ -595,7 +635,20 @@ REAL_EMAIL_ACTION_BLOCKS = {
             {"name": "true_branch", "type": "string", "required": False},
             {"name": "false_branch", "type": "string", "required": False}
         ],
-        "branches": ["complete", "partial", "gibberish"]
+        "branches": ["true", "false"]
+    },
+    "join_branches": {
+        "name": "Join Branches",
+        "category": "Logic",
+        "description": "Wait for parallel branches to finish before continuing (wait-all, wait-any or first-N)",
+        "action_count": 0,
+        "icon": "🔗",
+        "color": "#6B7280",
+        "node_type": "join",  # Handled by the workflow executor, no activity
+        "config_fields": [
+            {"name": "mode", "type": "select", "required": False, "options": ["all", "any", "first_n"], "default": "all"},
+            {"name": "count", "type": "integer", "required": False, "default": 1, "description": "Branches to wait for in first_n mode"}
+        ]
     },
     "extract_document_text": {
         "name": "Extract Document Text",
@@ -605,6 +658,12 @@ REAL_EMAIL_ACTION_BLOCKS = {
         "icon": "📄",
         "color": "#10B981",
         "activity_function": "extract_pdf_text",  # TODO: Implement this activity
+        # Large documents: allow long single attempts, bounded overall
+        "activity_options": {
+            "start_to_close_timeout": 900,
+            "schedule_to_close_timeout": 2700,
+            "retry": {"maximum_attempts": 3, "initial_interval": 10, "maximum_interval": 120, "non_retryable_error_types": ["ValueError"]}
+        },
         "config_fields": [
             {"name": "document_path", "type": "string", "required": True},
             {"name": "page_numbers", "type": "string", "required": False}
@@ -618,6 +677,12 @@ REAL_EMAIL_ACTION_BLOCKS = {
         "icon": "📋",
         "color": "#8B5CF6",
         "activity_function": "parse_document_ai",  # TODO: Implement this activity
+        # Large documents: allow long single attempts, bounded overall
+        "activity_options": {
+            "start_to_close_timeout": 900,
+            "schedule_to_close_timeout": 2700,
+            "retry": {"maximum_attempts": 3, "initial_interval": 10, "maximum_interval": 120, "non_retryable_error_types": ["ValueError"]}
+        },
         "config_fields": [
             {"name": "document_text", "type": "string", "required": True},
             {"name": "extraction_fields", "type": "array", "required": False},
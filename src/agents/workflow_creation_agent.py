@@ -7,7 +7,7 @@ It can read Word/PDF documents, analyze requirements, ask clarifying questions,
 
 import os
 import json
-from typing import Dict, Any, List, TypedDict, Annotated
+from typing import Dict, Any, AsyncIterator, List, TypedDict, Annotated
 from pathlib import Path
 import docx
 from PyPDF2 import PdfReader
@@ -734,6 +734,100 @@ def process_user_message(agent, message: str, conversation_history: List = None)
     }
 
 
+
+async def aprocess_user_message(agent, message: str, conversation_history: List = None) -> Dict[str, Any]:
+    """
+    Async version of process_user_message (uses agent.ainvoke).
+
+    The LLM calls are awaited instead of blocking the caller's event loop;
+    synchronous tools are run by LangGraph in its thread pool.
+
+    Args:
+        agent: The LangGraph agent
+        message: User's message
+        conversation_history: Previous conversation messages
+
+    Returns:
+        Agent's response and updated conversation history
+    """
+    if conversation_history is None:
+        conversation_history = []
+
+    # Add user message to history
+    conversation_history.append(HumanMessage(content=message))
+
+    # Invoke the agent
+    result = await agent.ainvoke({"messages": conversation_history})
+
+    # Extract agent's response
+    agent_response = result["messages"][-1].content
+
+    # Update conversation history
+    conversation_history.append(result["messages"][-1])
+
+    return {
+        "response": agent_response,
+        "conversation_history": conversation_history,
+        "tool_calls": [m for m in result["messages"] if hasattr(m, "tool_calls") and m.tool_calls]
+    }
+
+
+def _chunk_text(content: Any) -> str:
+    """Text of a streamed message chunk (plain string or Anthropic content blocks)"""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            block.get("text", "") for block in content
+            if isinstance(block, dict) and block.get("type") in ("text", "text_delta")
+        )
+    return ""
+
+
+async def astream_user_message(agent, message: str, conversation_history: List = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming version of process_user_message.
+
+    Yields events as the ReAct loop produces them:
+        {"type": "token", "text": ...}
+        {"type": "tool_start", "name": ..., "input": ...}
+        {"type": "tool_end", "name": ..., "output": ...}
+    and finally {"type": "done", ...} with the same fields process_user_message returns.
+    """
+    if conversation_history is None:
+        conversation_history = []
+
+    # Add user message to history
+    conversation_history.append(HumanMessage(content=message))
+
+    final_state = None
+    async for event in agent.astream_events({"messages": conversation_history}, version="v2"):
+        kind = event["event"]
+        if kind == "on_chat_model_stream":
+            text = _chunk_text(event["data"]["chunk"].content)
+            if text:
+                yield {"type": "token", "text": text}
+        elif kind == "on_tool_start":
+            yield {"type": "tool_start", "name": event["name"], "input": event["data"].get("input")}
+        elif kind == "on_tool_end":
+            output = event["data"].get("output")
+            yield {"type": "tool_end", "name": event["name"], "output": getattr(output, "content", output)}
+        elif kind == "on_chain_end" and not event.get("parent_ids"):
+            # End of the root graph run: its output is the final agent state
+            final_state = event["data"]["output"]
+
+    messages = final_state["messages"]
+
+    # Update conversation history
+    conversation_history.append(messages[-1])
+
+    yield {
+        "type": "done",
+        "response": messages[-1].content,
+        "conversation_history": conversation_history,
+        "tool_calls": [m for m in messages if hasattr(m, "tool_calls") and m.tool_calls]
+    }
+
 # ============================================================================
 # MAIN EXECUTION (for testing)
 # ============================================================================